@@ -0,0 +1,221 @@
+"""Local sales analytics computed with NumPy straight from raw deal records.
+
+Mirrors what the n8n workflow does remotely (filter by date range, minimum
+deal value and status, compare against the previous period) so a report can
+be produced from a CRM export without the workflow round trip.
+"""
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+STATUSES = ("Won", "Closed", "Lost")
+
+# Accepted spellings for each column, covering Airtable field names and plain exports
+COLUMN_ALIASES = {
+    "close_date": ("close_date", "Close Date", "Closed Date", "closed_at", "Date", "date"),
+    "amount": ("amount", "Amount", "Deal Value", "deal_value", "Value", "value"),
+    "status": ("status", "Status", "Deal Status", "deal_status", "Stage", "stage")
+}
+
+EXPORT_SUFFIXES = (".csv", ".parquet", ".jsonl", ".ndjson", ".json")
+# Deal exports are only read from this directory; unset turns local reports off
+DEAL_EXPORT_DIR = os.environ.get("DEAL_EXPORT_DIR", "")
+
+_EPOCH = date(1970, 1, 1)
+
+
+def day_number(value):
+    if isinstance(value, datetime):
+        value = value.date()
+    return (value - _EPOCH).days
+
+
+def _read_airtable(path):
+    # {"records": [{"id": ..., "createdTime": ..., "fields": {...}}, ...]}
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    records = data.get("records") if isinstance(data, dict) else data
+    if not isinstance(records, list) or not all(isinstance(record, dict) for record in records):
+        raise ValueError(
+            "JSON deal export must be a list of deal records or an Airtable export "
+            "with a \"records\" list of objects"
+        )
+    fields = [record.get("fields", record) for record in records]
+    if not all(isinstance(row, dict) for row in fields):
+        raise ValueError("Airtable records must have a \"fields\" object")
+    return pd.DataFrame.from_records(fields)
+
+
+def read_deals(path):
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return pd.read_csv(path)
+    if suffix == ".parquet":
+        return pd.read_parquet(path)
+    if suffix in (".jsonl", ".ndjson"):
+        return pd.read_json(path, lines=True)
+    if suffix == ".json":
+        return _read_airtable(path)
+    raise ValueError(f"Unsupported deal export format: {path.suffix or path.name}")
+
+
+def list_exports(export_dir=DEAL_EXPORT_DIR):
+    # File names of the readable exports directly inside export_dir
+    root = Path(export_dir) if export_dir else None
+    if root is None or not root.is_dir():
+        return []
+    return sorted(path.name for path in root.iterdir()
+                  if path.suffix.lower() in EXPORT_SUFFIXES and path.is_file())
+
+
+def resolve_export(name, export_dir=DEAL_EXPORT_DIR):
+    # Absolute path of an export inside export_dir. Anything else is refused before
+    # it's opened, with the same message whether or not the file exists
+    if not export_dir:
+        raise ValueError("Local deal exports are turned off (set DEAL_EXPORT_DIR to enable them)")
+    root = Path(export_dir).resolve()
+    path = (root / name).resolve()
+    if path.parent != root or path.suffix.lower() not in EXPORT_SUFFIXES or not path.is_file():
+        raise ValueError(f"No deal export named {name!r} in the export directory")
+    return str(path)
+
+
+@dataclass(frozen=True)
+class DealSet:
+    """Column arrays for fast filtering: day number, amount and status code per deal."""
+    days: np.ndarray
+    amounts: np.ndarray
+    status_codes: np.ndarray
+    statuses: tuple
+
+    def __len__(self):
+        return len(self.days)
+
+    @classmethod
+    def from_frame(cls, frame):
+        columns = {}
+        for name, aliases in COLUMN_ALIASES.items():
+            match = next((alias for alias in aliases if alias in frame.columns), None)
+            if match is None:
+                raise ValueError(f"Deal records are missing a '{name}' column (tried: {', '.join(aliases)})")
+            columns[name] = frame[match]
+
+        close_dates = pd.to_datetime(columns["close_date"], errors="coerce", utc=True)
+        amounts = pd.to_numeric(columns["amount"], errors="coerce").to_numpy(dtype=np.float64)
+        status = columns["status"].astype("string").str.strip().str.title().astype("category")
+
+        # Rows without a usable date can never match a range, so drop them once here
+        valid = close_dates.notna().to_numpy()
+        days = (close_dates.dt.tz_localize(None).dt.normalize().to_numpy()
+                .astype("datetime64[D]").astype(np.int64))
+        return cls(
+            days=days[valid],
+            amounts=np.nan_to_num(amounts[valid]),
+            status_codes=status.cat.codes.to_numpy()[valid],
+            statuses=tuple(status.cat.categories)
+        )
+
+    @classmethod
+    def from_path(cls, path):
+        return cls.from_frame(read_deals(path))
+
+    def status_labels(self):
+        # Status text per deal ("" where missing); codes alone differ between exports
+        return np.asarray(self.statuses + ("",), dtype=object)[self.status_codes]
+
+    def tail(self, start):
+        return DealSet(self.days[start:], self.amounts[start:], self.status_codes[start:], self.statuses)
+
+    def starts_with(self, other):
+        # True when this export is ``other`` with rows appended at the end
+        n = len(other)
+        return n <= len(self) and np.array_equal(self.days[:n], other.days) and \
+            np.array_equal(self.amounts[:n], other.amounts) and \
+            np.array_equal(self.status_labels()[:n], other.status_labels())
+
+    def status_mask(self, deal_status):
+        wanted = {s.strip().title() for s in deal_status}
+        lookup = np.array([s in wanted for s in self.statuses] + [False])
+        # Missing statuses have code -1, which indexes the trailing False
+        return lookup[self.status_codes]
+
+    def range_mask(self, start_day, end_day):
+        return (self.days >= start_day) & (self.days <= end_day)
+
+
+@dataclass(frozen=True)
+class SalesMetrics:
+    start_date: date
+    end_date: date
+    deals: int
+    revenue: float
+    avg_deal_size: float
+    prev_deals: int
+    prev_revenue: float
+    wow_change: float = None
+    win_rate: float = None
+    status_counts: dict = field(default_factory=dict)
+
+
+def compute_metrics(deal_set, start_date, end_date, min_deal_value=0, deal_status=("Won", "Closed")):
+    start_day = day_number(start_date)
+    end_day = day_number(end_date)
+    span = end_day - start_day + 1
+
+    value_mask = deal_set.amounts >= min_deal_value
+    selected = value_mask & deal_set.status_mask(deal_status)
+    current = deal_set.range_mask(start_day, end_day) & value_mask
+    previous = deal_set.range_mask(start_day - span, start_day - 1) & selected
+
+    in_report = current & selected
+    deals = int(np.count_nonzero(in_report))
+    revenue = float(deal_set.amounts[in_report].sum())
+    prev_deals = int(np.count_nonzero(previous))
+    prev_revenue = float(deal_set.amounts[previous].sum())
+
+    # Win rate looks at every decided deal in the period, whatever the status filter
+    counts = np.bincount(deal_set.status_codes[current] + 1, minlength=len(deal_set.statuses) + 1)[1:]
+    status_counts = {status: int(count) for status, count in zip(deal_set.statuses, counts)}
+    won = status_counts.get("Won", 0) + status_counts.get("Closed", 0)
+    decided = won + status_counts.get("Lost", 0)
+
+    return SalesMetrics(
+        start_date=start_date,
+        end_date=end_date,
+        deals=deals,
+        revenue=revenue,
+        avg_deal_size=revenue / deals if deals else 0.0,
+        prev_deals=prev_deals,
+        prev_revenue=prev_revenue,
+        wow_change=(revenue - prev_revenue) / prev_revenue * 100 if prev_revenue else None,
+        win_rate=won / decided * 100 if decided else None,
+        status_counts=status_counts
+    )
+
+
+def format_report(metrics):
+    # Same labels as the n8n Slack message, so report_parser and the chatbot read it unchanged
+    wow = f"{metrics.wow_change:+.1f}%" if metrics.wow_change is not None else "n/a"
+    win_rate = f"{metrics.win_rate:.1f}%" if metrics.win_rate is not None else "n/a"
+    if metrics.wow_change is None:
+        trend = "There is no previous-period revenue to compare against."
+    elif metrics.wow_change >= 0:
+        trend = f"Revenue is up {metrics.wow_change:.1f}% on the previous period."
+    else:
+        trend = f"Revenue is down {abs(metrics.wow_change):.1f}% on the previous period."
+
+    return "\n".join([
+        f"📊 *Sales Report* ({metrics.start_date:%Y-%m-%d} → {metrics.end_date:%Y-%m-%d})",
+        f"✅ Won Deals: {metrics.deals:,}",
+        f"💰 Closed Revenue: ${metrics.revenue:,.0f}",
+        f"📏 Average Deal Size: ${metrics.avg_deal_size:,.0f}",
+        f"🏆 Win Rate: {win_rate}",
+        f"📈 Latest: ${metrics.revenue:,.0f} | Prev: ${metrics.prev_revenue:,.0f} | WoW: {wow}",
+        f"📝 Summary: {metrics.deals:,} deals closed for ${metrics.revenue:,.0f}. {trend}"
+    ])
@@ -0,0 +1,222 @@
+"""Per-report, per-API-key chatbot answer cache that also matches reworded questions.
+
+Questions are normalized (case, punctuation, contractions, filler words,
+crude stemming) and compared with TF-IDF cosine similarity, with IDF taken
+from the questions already cached for the same report and key. No model
+call or network access is needed to find a match. Answers are only handed
+back to sessions using the API key that paid for them.
+"""
+import hashlib
+import math
+import re
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+
+DEFAULT_THRESHOLD = 0.75
+DEFAULT_MAX_ENTRIES = 1000
+# Follow-ups ("why?", "tell me more about that") depend on the conversation, so never cache them
+_FOLLOW_UPS = {"why", "explain", "elaborate", "more", "else", "again", "that", "it", "those", "them", "they"}
+
+_CONTRACTIONS = {
+    "what's": "what is", "whats": "what is", "how's": "how is", "where's": "where is", "who's": "who is",
+    "isn't": "is not", "aren't": "are not", "didn't": "did not", "doesn't": "does not",
+    "we're": "we are", "it's": "it is", "there's": "there is"
+}
+_STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "do", "does", "did",
+    "what", "which", "how", "our", "we", "us", "my", "i", "me", "you", "your", "it",
+    "this", "that", "these", "those", "of", "for", "in", "on", "to", "and", "or",
+    "can", "could", "would", "should", "please", "tell", "show", "give", "about", "there",
+    "many", "much", "so", "far", "right", "now", "current", "currently",
+    # Every cached answer is already scoped to one report and its period
+    "week", "weekly", "period", "report", "data", "sales"
+}
+_WORD = re.compile(r"[a-z0-9%$]+")
+
+# Words that change which numbers a question is about. Questions that differ in
+# any of these never share an answer, however similar the rest of the wording is
+_SCOPE_WORDS = {
+    "today": "day", "yesterday": "yesterday", "day": "day", "days": "day", "daily": "day",
+    "week": "week", "weeks": "week", "weekly": "week",
+    "month": "month", "months": "month", "monthly": "month", "mom": "month",
+    "quarter": "quarter", "quarters": "quarter", "quarterly": "quarter", "qoq": "quarter",
+    "year": "year", "years": "year", "yearly": "year", "annual": "year", "annually": "year",
+    "ytd": "year", "yoy": "year",
+    "monday": "monday", "tuesday": "tuesday", "wednesday": "wednesday", "thursday": "thursday",
+    "friday": "friday", "saturday": "saturday", "sunday": "sunday",
+    "previous": "previous", "prior": "previous", "last": "previous", "next": "next",
+    "won": "won", "win": "won", "lost": "lost", "lose": "lost", "losing": "lost",
+    "open": "open", "pending": "open", "pipeline": "open", "close": "closed", "closed": "closed",
+    "target": "target", "targets": "target", "goal": "target", "goals": "target",
+    "quota": "target", "forecast": "target", "budget": "target"
+}
+
+
+def _words(question):
+    text = question.lower().replace("’", "'")
+    for contraction, expanded in _CONTRACTIONS.items():
+        text = text.replace(contraction, expanded)
+    return _WORD.findall(text)
+
+
+def is_cacheable(question):
+    words = _words(question)
+    return bool(normalize_question(question)) and not _FOLLOW_UPS.intersection(words)
+
+
+def question_scope(question):
+    # Sorted scope words, e.g. "revenue last month?" -> ("month", "previous")
+    return tuple(sorted({_SCOPE_WORDS[word] for word in _words(question) if word in _SCOPE_WORDS}))
+
+
+def normalize_question(question):
+    words = []
+    for word in _words(question):
+        if word in _STOPWORDS:
+            continue
+        words.append(_stem(word))
+    return " ".join(words)
+
+
+def _stem(word):
+    # Crude suffix folding: "deals" -> "deal", "closed"/"close" -> "clos"
+    for suffix in ("ing", "ed", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix) and not word.endswith("ss"):
+            word = word[:-len(suffix)]
+            break
+    if len(word) > 3 and word.endswith("e"):
+        word = word[:-1]
+    return word
+
+
+def _key_owner(api_key):
+    # The key itself is never stored, only its hash
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+
+
+def _terms(normalized):
+    return Counter(normalized.split())
+
+
+@dataclass
+class CachedAnswer:
+    question: str
+    answer: str
+    terms: Counter
+    similarity: float = 1.0
+
+
+class AnswerCache:
+    """LRU cache of (API key hash, report hash, question) -> answer with near-duplicate lookup.
+
+    Near-duplicates are only looked for among questions with the same scope
+    (time range, comparison, deal status, target), see question_scope.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, max_entries=DEFAULT_MAX_ENTRIES):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._reports = {}
+        self._lock = threading.Lock()
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def lookup(self, report_key, api_key, question):
+        if not is_cacheable(question):
+            return None
+        normalized = normalize_question(question)
+        scope = question_scope(question)
+        report = (_key_owner(api_key), report_key)
+
+        with self._lock:
+            key = report + (normalized, scope)
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.exact_hits += 1
+                return CachedAnswer(entry.question, entry.answer, entry.terms, 1.0)
+
+            best_key, best_score = self._most_similar(report, scope, _terms(normalized))
+            if best_key is not None and best_score >= self.threshold:
+                entry = self._entries[best_key]
+                self._entries.move_to_end(best_key)
+                self.similar_hits += 1
+                return CachedAnswer(entry.question, entry.answer, entry.terms, best_score)
+
+            self.misses += 1
+            return None
+
+    def store(self, report_key, api_key, question, answer):
+        if not is_cacheable(question):
+            return
+        normalized = normalize_question(question)
+        report = (_key_owner(api_key), report_key)
+
+        with self._lock:
+            key = report + (normalized, question_scope(question))
+            self._entries[key] = CachedAnswer(question, answer, _terms(normalized))
+            self._entries.move_to_end(key)
+            self._reports.setdefault(report, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, _ = self._entries.popitem(last=False)
+                self._forget(old_key)
+
+    def invalidate(self, report_key):
+        # Drops the report's answers for every API key
+        with self._lock:
+            for report in [report for report in self._reports if report[1] == report_key]:
+                for key in self._reports.pop(report):
+                    self._entries.pop(key, None)
+
+    def stats(self):
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "reports": len(self._reports),
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": hits / lookups if lookups else 0.0
+            }
+
+    def _forget(self, key):
+        keys = self._reports.get(key[:2])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._reports[key[:2]]
+
+    def _most_similar(self, report, scope, query_terms):
+        keys = list(self._reports.get(report, ()))
+        if not any(key[3] == scope for key in keys):
+            return None, 0.0
+
+        # Smoothed IDF over this report and key's cached questions plus the query
+        documents = [self._entries[key].terms for key in keys]
+        doc_count = len(documents) + 1
+        frequency = Counter(query_terms.keys())
+        for terms in documents:
+            frequency.update(terms.keys())
+
+        def weights(terms):
+            return {term: count * (math.log((1 + doc_count) / (1 + frequency[term])) + 1)
+                    for term, count in terms.items()}
+
+        query = weights(query_terms)
+        query_norm = math.sqrt(sum(w * w for w in query.values()))
+        best_key, best_score = None, 0.0
+        for key, terms in zip(keys, documents):
+            if key[3] != scope:
+                continue
+            candidate = weights(terms)
+            dot = sum(w * candidate.get(term, 0.0) for term, w in query.items())
+            norm = query_norm * math.sqrt(sum(w * w for w in candidate.values()))
+            score = dot / norm if norm else 0.0
+            if score > best_score:
+                best_key, best_score = key, score
+        return best_key, best_score
@@ -0,0 +1,81 @@
+"""Chat completion helpers for the report chatbot, with per-answer timing."""
+import time
+from dataclasses import dataclass, field
+
+from telemetry import TELEMETRY
+
+CHAT_MODEL = "gpt-4"
+CHAT_TEMPERATURE = 0.7
+CHAT_MAX_TOKENS = 500
+
+
+@dataclass
+class AnswerStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    first_token_at: float = None
+    finished_at: float = None
+    completed: bool = False
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    @property
+    def total_time(self):
+        if self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+
+def record_usage(usage):
+    if usage is not None:
+        TELEMETRY.record_tokens(usage.prompt_tokens, usage.completion_tokens)
+
+
+def complete_answer(client, messages, stats, model=CHAT_MODEL):
+    # Wait for the whole completion in one response
+    with TELEMETRY.span("openai_call"):
+        response = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=CHAT_TEMPERATURE,
+            max_tokens=CHAT_MAX_TOKENS
+        )
+    stats.first_token_at = stats.finished_at = time.perf_counter()
+    stats.completed = True
+    record_usage(response.usage)
+    return response.choices[0].message.content
+
+
+def stream_answer(client, messages, stats, model=CHAT_MODEL):
+    # Yields text deltas as they arrive. Closing the generator early (the user
+    # reran the page mid-answer) also closes the HTTP stream in the finally block.
+    started = time.perf_counter()
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=CHAT_TEMPERATURE,
+        max_tokens=CHAT_MAX_TOKENS,
+        stream=True,
+        # The last chunk then carries the token counts
+        stream_options={"include_usage": True}
+    )
+    try:
+        for chunk in stream:
+            if chunk.usage is not None:
+                record_usage(chunk.usage)
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content
+            if delta:
+                if stats.first_token_at is None:
+                    stats.first_token_at = time.perf_counter()
+                    TELEMETRY.observe("openai_first_token", stats.first_token_at - started)
+                yield delta
+        stats.completed = True
+    finally:
+        stats.finished_at = time.perf_counter()
+        TELEMETRY.observe("openai_call", stats.finished_at - started)
+        stream.close()
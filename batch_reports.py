@@ -0,0 +1,167 @@
+"""Generate many sales reports headlessly: date ranges x channels x status filters.
+
+Examples:
+    python batch_reports.py --weeks 12 --channel "#sales-reports"
+    python batch_reports.py --range 2024-05-01:2024-05-07 -c "#east" -c "#west" \\
+        --statuses Won,Closed --statuses Won --concurrency 6 --output weekly.jsonl
+
+Uses the same payload building and response parsing as chat.py, without importing Streamlit.
+"""
+import argparse
+import itertools
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+from n8n_client import DEFAULT_TIMEOUT, build_payload, generate_report
+from report_parser import parse_report
+from telemetry import TELEMETRY, percentile
+from transport import create_http_session
+
+DEFAULT_CONCURRENCY = 4
+
+
+def parse_range(value):
+    try:
+        start, end = value.split(":", 1)
+        return datetime.strptime(start, "%Y-%m-%d"), datetime.strptime(end, "%Y-%m-%d")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected START:END as YYYY-MM-DD:YYYY-MM-DD, got {value!r}")
+
+
+def parse_statuses(value):
+    return [s.strip().title() for s in value.split(",") if s.strip()]
+
+
+def trailing_ranges(count, days, now=None):
+    # Same shape as the "Last 7 Days" / "Last 30 Days" presets, stepping back one period at a time
+    end = now or datetime.now()
+    ranges = []
+    for _ in range(count):
+        ranges.append((end - timedelta(days=days), end))
+        end -= timedelta(days=days)
+    return ranges
+
+
+def build_matrix(ranges, channels, status_sets, min_deal_value):
+    return [
+        build_payload(start, end, min_deal_value, statuses, channel)
+        for (start, end), channel, statuses in itertools.product(ranges, channels, status_sets)
+    ]
+
+
+def run_one(payload, session, timeout):
+    started = time.perf_counter()
+    outcome = generate_report(payload, timeout=timeout, session=session)
+    elapsed = time.perf_counter() - started
+
+    record = {
+        "payload": payload,
+        "status": outcome["status"],
+        "status_code": outcome["status_code"],
+        "elapsed": round(elapsed, 3),
+        "channel": outcome["channel"],
+        "slack_message_text": outcome["slack_message_text"],
+        "metrics": None,
+        "error": outcome["error"]
+    }
+    if outcome["slack_message_text"]:
+        record["metrics"] = asdict(parse_report(outcome["slack_message_text"]))
+    return record
+
+
+def run_batch(payloads, output, concurrency=DEFAULT_CONCURRENCY, timeout=DEFAULT_TIMEOUT, log=sys.stderr):
+    # The pool size is the cap on concurrent requests to n8n
+    session = create_http_session(pool_maxsize=concurrency)
+    write_lock = threading.Lock()
+    statuses = {}
+    latencies = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch-report") as pool:
+        futures = {pool.submit(run_one, payload, session, timeout): payload for payload in payloads}
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            with write_lock:
+                output.write(json.dumps(record, default=str) + "\n")
+                output.flush()
+            statuses[record["status"]] = statuses.get(record["status"], 0) + 1
+            latencies.append(record["elapsed"])
+            payload = record["payload"]
+            print(f"[{done}/{len(payloads)}] {record['status']:<17} {record['elapsed']:>6.1f}s  "
+                  f"{payload['start_date']}..{payload['end_date']} {payload['slack_channel']} "
+                  f"{','.join(payload['deal_status'])}", file=log)
+
+    wall = time.perf_counter() - started
+    summary = {
+        "reports": len(payloads),
+        "statuses": statuses,
+        "wall_seconds": round(wall, 3),
+        "reports_per_minute": round(len(payloads) / wall * 60, 2) if wall else None,
+        "latency_p50": percentile(latencies, 0.50),
+        "latency_p95": percentile(latencies, 0.95),
+        "concurrency": concurrency
+    }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--range", dest="ranges", action="append", type=parse_range, default=[],
+                        metavar="START:END", help="explicit date range (repeatable)")
+    parser.add_argument("--weeks", type=int, default=0, help="add N trailing 7-day ranges")
+    parser.add_argument("--months", type=int, default=0, help="add N trailing 30-day ranges")
+    parser.add_argument("-c", "--channel", dest="channels", action="append", default=[],
+                        help="Slack channel (repeatable, default #sales-reports)")
+    parser.add_argument("--statuses", dest="status_sets", action="append", type=parse_statuses, default=[],
+                        help="comma-separated deal statuses, one filter per flag (default Won,Closed)")
+    parser.add_argument("--min-deal-value", type=int, default=0)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="max reports in flight against n8n at once")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="per-report read timeout (s)")
+    parser.add_argument("-o", "--output", default="-", help="JSONL output file (default stdout)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write per-stage timings here (.prom for Prometheus text, otherwise JSONL)")
+    parser.add_argument("--dry-run", action="store_true", help="print the payloads without calling n8n")
+    args = parser.parse_args(argv)
+
+    ranges = args.ranges + trailing_ranges(args.weeks, 7) + trailing_ranges(args.months, 30)
+    if not ranges:
+        ranges = trailing_ranges(1, 7)
+    channels = args.channels or ["#sales-reports"]
+    status_sets = args.status_sets or [["Won", "Closed"]]
+    payloads = build_matrix(ranges, channels, status_sets, args.min_deal_value)
+
+    if args.dry_run:
+        for payload in payloads:
+            print(json.dumps(payload))
+        return 0
+
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    try:
+        summary = run_batch(payloads, output, concurrency=args.concurrency, timeout=args.timeout)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if args.metrics:
+        export = TELEMETRY.to_prometheus() if args.metrics.endswith(".prom") else TELEMETRY.to_jsonl()
+        with open(args.metrics, "w", encoding="utf-8") as f:
+            f.write(export)
+
+    print(f"\n{summary['reports']} reports in {summary['wall_seconds']:.1f}s "
+          f"({summary['reports_per_minute']} / min, concurrency {summary['concurrency']})", file=sys.stderr)
+    print(f"latency p50 {summary['latency_p50']:.1f}s  p95 {summary['latency_p95']:.1f}s  "
+          f"statuses {summary['statuses']}", file=sys.stderr)
+    return 0 if set(summary["statuses"]) <= {"success"} else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Benchmark: local analytics engine and daily rollups on a synthetic deal export.
+
+Run from the repo root:  python benchmarks/bench_analytics.py [deal_count]
+"""
+import os
+import sys
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import DealSet, compute_metrics, format_report  # noqa: E402
+from rollups import DailyRollups  # noqa: E402
+
+
+def synthetic_deals(count, days=730, seed=0):
+    # Airtable-style column names, a couple of years of close dates
+    rng = np.random.default_rng(seed)
+    first_day = np.datetime64(date.today() - timedelta(days=days))
+    return pd.DataFrame({
+        "Close Date": first_day + rng.integers(0, days, count).astype("timedelta64[D]"),
+        "Deal Value": rng.lognormal(9, 1.2, count).round(2),
+        "Status": rng.choice(["Won", "Closed", "Lost", "Open"], count, p=[0.35, 0.15, 0.3, 0.2])
+    })
+
+
+if __name__ == "__main__":
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    frame = synthetic_deals(count)
+
+    started = time.perf_counter()
+    deal_set = DealSet.from_frame(frame)
+    print(f"normalize {count:,} deals: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    started = time.perf_counter()
+    rollups = DailyRollups.from_deal_set(deal_set)
+    print(f"build daily rollups ({rollups.days} days): {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    end = date.today()
+    for label, span, min_value, statuses in [
+        ("last 7 days", 7, 0, ["Won", "Closed"]),
+        ("last 30 days", 30, 0, ["Won", "Closed"]),
+        ("last 365 days, >= $10k", 365, 10_000, ["Won"]),
+    ]:
+        runs = 20
+        started = time.perf_counter()
+        for _ in range(runs):
+            metrics = compute_metrics(deal_set, end - timedelta(days=span), end, min_value, statuses)
+        scan = (time.perf_counter() - started) / runs
+
+        started = time.perf_counter()
+        for _ in range(runs):
+            rolled = rollups.metrics(end - timedelta(days=span), end, min_value, statuses)
+        lookup = (time.perf_counter() - started) / runs
+
+        assert rolled.deals == metrics.deals
+        print(f"{label:<24} scan {scan * 1000:>7.1f} ms  rollup {lookup * 1000:>6.3f} ms  "
+              f"deals={metrics.deals:,} revenue=${metrics.revenue:,.0f}")
+
+    print()
+    print(format_report(metrics))
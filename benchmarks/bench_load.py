@@ -0,0 +1,233 @@
+"""Load benchmark: N concurrent headless chat.py sessions against the local n8n/OpenAI stand-ins.
+
+    python benchmarks/bench_load.py --sessions 24 --concurrency 6 --latency 1.5 --error-rate 0.05
+
+Each session opens the app, generates a report through the webhook job path
+and asks the chatbot one open-ended question, all through Streamlit's
+AppTest. AppTest installs a process-global runtime and isn't thread-safe,
+so concurrent sessions run in separate worker processes; sessions handled
+by the same worker share its st.cache_resource singletons, as sessions on
+one Streamlit server would.
+
+Reports latency percentiles per step, throughput and resident memory per
+session. --output appends one JSON record per run so results can be
+compared across commits.
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mock_servers import MockConfig, start_server  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chat.py")
+QUESTION = "Why did revenue change compared with the previous period?"
+# How often a session re-runs the page while its report job is in flight; AppTest
+# doesn't drive the app's run_every progress fragment, so it stands in for it
+POLL_SECONDS = 0.1
+
+_timeout = 120
+
+
+def rss_bytes():
+    # Current resident set size; falls back to the peak where /proc isn't available
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return peak_rss_bytes()
+
+
+def peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _click(app, label):
+    next(button for button in app.button if label in button.label).click().run()
+
+
+def wait_for_report(app):
+    # Full reruns until the job has finished and been picked up
+    while app.session_state["report_job"] and not app.exception:
+        time.sleep(POLL_SECONDS)
+        app.run()
+
+
+def init_worker(timeout):
+    global _timeout
+    _timeout = timeout
+    # Import the app's modules (and the chatbot's lazy openai import) once,
+    # so the first session on each worker isn't charged for them
+    AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+    import openai  # noqa: F401
+
+
+def run_session(index, question):
+    record = {"session": index, "pid": os.getpid(), "status": "success", "error": None,
+              "report_seconds": None, "chat_seconds": None}
+    rss_before = rss_bytes()
+    started = time.perf_counter()
+    try:
+        app = AppTest.from_file(APP_PATH, default_timeout=_timeout)
+        app.run()
+        # A distinct filter per session, so the shared report cache can't answer for the webhook
+        app.sidebar.number_input[0].set_value(index * 100).run()
+
+        step = time.perf_counter()
+        _click(app, "Generate")
+        wait_for_report(app)
+        record["report_seconds"] = time.perf_counter() - step
+        if app.exception:
+            raise RuntimeError(app.exception[0].value)
+        if not app.session_state["report_key"]:
+            record["status"] = "report_failed"
+            record["error"] = app.error[0].value if app.error else "no report"
+        else:
+            app.sidebar.text_input[-1].set_value("sk-benchmark").run()
+            app.text_input(key="user_input").set_value(question).run()
+            step = time.perf_counter()
+            _click(app, "Ask")
+            record["chat_seconds"] = time.perf_counter() - step
+            history = app.session_state["chat_history"]
+            if not len(history) or history[-1].role != "assistant":
+                record["status"] = "chat_failed"
+                record["error"] = app.error[0].value if app.error else "no answer"
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+
+    record["total_seconds"] = time.perf_counter() - started
+    record["rss_delta"] = rss_bytes() - rss_before
+    record["peak_rss"] = peak_rss_bytes()
+    return record
+
+
+def summarize(records, wall, args):
+    def latencies(key):
+        values = [r[key] for r in records if r[key] is not None]
+        return {
+            "count": len(values),
+            "p50": percentile(values, 0.50),
+            "p95": percentile(values, 0.95),
+            "p99": percentile(values, 0.99),
+            "max": max(values, default=0.0)
+        }
+
+    statuses = {}
+    for r in records:
+        statuses[r["status"]] = statuses.get(r["status"], 0) + 1
+    peak_by_worker = {}
+    for r in records:
+        peak_by_worker[r["pid"]] = max(peak_by_worker.get(r["pid"], 0), r["peak_rss"])
+    deltas = [r["rss_delta"] for r in records]
+
+    return {
+        "sessions": len(records),
+        "concurrency": args.concurrency,
+        "statuses": statuses,
+        "wall_seconds": wall,
+        "sessions_per_minute": len(records) / wall * 60 if wall else None,
+        "report": latencies("report_seconds"),
+        "chat": latencies("chat_seconds"),
+        "total": latencies("total_seconds"),
+        "rss_delta_per_session_mb": {
+            "mean": sum(deltas) / len(deltas) / 2 ** 20 if deltas else 0.0,
+            "max": max(deltas, default=0) / 2 ** 20
+        },
+        "worker_peak_rss_mb": max(peak_by_worker.values(), default=0) / 2 ** 20,
+        "mock": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "not_found_rate": args.not_found_rate,
+            "chat_latency": args.chat_latency
+        }
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(APP_PATH)).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sessions", type=int, default=12)
+    parser.add_argument("--concurrency", type=int, default=4, help="sessions in flight (worker processes)")
+    parser.add_argument("--latency", type=float, default=1.0, help="mean mock webhook latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.3)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--not-found-rate", type=float, default=0.0)
+    parser.add_argument("--chat-latency", type=float, default=0.3)
+    parser.add_argument("--token-delay", type=float, default=0.005)
+    parser.add_argument("--timeout", type=float, default=120, help="per AppTest run (s)")
+    parser.add_argument("--question", default=QUESTION)
+    parser.add_argument("-o", "--output", help="append the summary as one JSON line to this file")
+    args = parser.parse_args(argv)
+
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.not_found_rate,
+                        args.chat_latency, args.token_delay, seed=0)
+    server = start_server(config)
+    # Inherited by the worker processes before they import n8n_client or openai
+    os.environ["N8N_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{server.server_port}/v1"
+    # Benchmark reports go to a throwaway history, not the app's real one
+    history_dir = tempfile.TemporaryDirectory(prefix="bench_load_")
+    os.environ["REPORT_HISTORY_PATH"] = os.path.join(history_dir.name, "report_history.sqlite3")
+
+    records = []
+    with ProcessPoolExecutor(max_workers=args.concurrency, initializer=init_worker,
+                             initargs=(args.timeout,)) as pool:
+        # Start the clock once every worker has warmed up
+        list(pool.map(time.sleep, [0] * args.concurrency))
+        started = time.perf_counter()
+        futures = [pool.submit(run_session, i, args.question) for i in range(args.sessions)]
+        for done, future in enumerate(as_completed(futures), start=1):
+            record = future.result()
+            records.append(record)
+            print(f"[{done}/{args.sessions}] session {record['session']:>3} {record['status']:<13} "
+                  f"{record['total_seconds']:6.2f}s", file=sys.stderr)
+        wall = time.perf_counter() - started
+    server.shutdown()
+    history_dir.cleanup()
+
+    summary = summarize(records, wall, args)
+    summary["mock_requests"] = config.requests
+    summary["revision"] = git_revision()
+    summary["timestamp"] = time.time()
+
+    print(f"\n{summary['sessions']} sessions, concurrency {args.concurrency}: {wall:.1f}s wall, "
+          f"{summary['sessions_per_minute']:.1f} sessions/min, statuses {summary['statuses']}")
+    for step in ("report", "chat", "total"):
+        s = summary[step]
+        print(f"{step:<7} p50 {s['p50']:6.2f}s  p95 {s['p95']:6.2f}s  p99 {s['p99']:6.2f}s  "
+              f"max {s['max']:6.2f}s  (n={s['count']})")
+    print(f"memory  {summary['rss_delta_per_session_mb']['mean']:.1f} MB RSS growth per session "
+          f"(max {summary['rss_delta_per_session_mb']['max']:.1f}), "
+          f"worker peak {summary['worker_peak_rss_mb']:.0f} MB")
+
+    if args.output:
+        with open(args.output, "a", encoding="utf-8") as f:
+            f.write(json.dumps(summary) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    # Workers unpickle run_session by module name, and AppTest rebinds __main__ to chat.py
+    import bench_load
+    sys.exit(bench_load.main())
@@ -0,0 +1,84 @@
+"""Benchmark: bytes each session holds for its report and chat, before and after interning.
+
+Before, every session kept its own copy of the report text and a list of
+plain dicts for the chat. Now sessions keep the report's hash (the text is
+interned once in REPORT_STORE) and a ChatHistory of slotted turns with the
+older ones compressed. Both layouts are built for N sessions looking at the
+same report and measured with tracemalloc.
+
+Run from the repo root:  python benchmarks/bench_memory.py [sessions] [chat_turns]
+"""
+import os
+import random
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_history import ASSISTANT, USER, ChatHistory  # noqa: E402
+from report_store import ReportStore  # noqa: E402
+from sample_data import sample_report  # noqa: E402
+
+SENTENCES = [
+    "Revenue is up on the previous period, driven by a handful of larger deals.",
+    "Deal count is flat, so growth is coming from deal size rather than volume.",
+    "The win rate slipped slightly, which is worth watching over the next two weeks.",
+    "Mid-market accounts closed faster than enterprise ones this period.",
+    "Focus follow-ups on open opportunities above the average deal size.",
+    "The week-over-week change is within the usual range for this time of quarter."
+]
+
+
+def conversation(rng, turns):
+    # (question, answer) pairs of realistic length
+    return [(f"Question {turn}: what stands out about {rng.choice(['revenue', 'deals', 'win rate'])}?",
+             " ".join(rng.choice(SENTENCES) for _ in range(rng.randint(4, 10))))
+            for turn in range(turns)]
+
+
+def fresh_copy(text):
+    # Each session used to get its own string (decoded from a response or the history)
+    return text.encode("utf-8").decode("utf-8")
+
+
+def before_session(report_text, chat):
+    history = []
+    for question, answer in chat:
+        history.append({"role": "user", "content": fresh_copy(question)})
+        history.append({"role": "assistant", "content": fresh_copy(answer), "ttft": 0.4, "total_time": 3.2})
+    return {"report_data": fresh_copy(report_text), "chat_history": history}
+
+
+def after_session(report_text, chat, store):
+    history = ChatHistory()
+    for question, answer in chat:
+        history.add(USER, fresh_copy(question))
+        history.add(ASSISTANT, fresh_copy(answer), ttft=0.4, total_time=3.2)
+    return {"report_key": store.put(fresh_copy(report_text)), "chat_history": history}
+
+
+def measure(build, sessions):
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept = [build(i) for i in range(sessions)]
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used, kept
+
+
+if __name__ == "__main__":
+    sessions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    # A realistically long report: the formatted metrics plus the workflow's commentary
+    report_text = sample_report() + "\n" + "\n".join(SENTENCES * 20)
+    chats = [conversation(random.Random(i), turns) for i in range(sessions)]
+
+    before, _ = measure(lambda i: before_session(report_text, chats[i]), sessions)
+    store = ReportStore()
+    after, _ = measure(lambda i: after_session(report_text, chats[i], store), sessions)
+
+    print(f"{sessions} sessions on one {len(report_text):,}-character report, {turns} chat turns each")
+    print(f"before: {before / sessions:9,.0f} bytes per session  ({before / 2 ** 20:6.1f} MB total)")
+    print(f"after:  {after / sessions:9,.0f} bytes per session  ({after / 2 ** 20:6.1f} MB total, "
+          f"including {store.stats()['bytes']:,} bytes of shared report text)")
+    print(f"saved   {1 - after / before:.0%}")
@@ -0,0 +1,84 @@
+"""Microbenchmark: legacy Quick Stats line loop vs report_parser on large and malformed reports.
+
+The uncached parse is not the win: it runs a label regex on every line and
+extracts more fields than the legacy loop, so it's faster on reports whose
+lines mostly carry no label but slower when nearly every line has one (the
+malformed case). The gain comes from memoization, which every rerun after the
+first gets.
+
+Run from the repo root:  python benchmarks/bench_report_parser.py
+"""
+import os
+import random
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from report_parser import parse_report, parse_report_uncached  # noqa: E402
+
+SAMPLE_REPORT = """📊 *Weekly Sales Report* (2024-05-01 → 2024-05-07)
+✅ Won Deals: 42
+💰 Closed Revenue: $1,284,500
+📈 Latest: $1,284,500 | Prev: $1,102,300 | WoW: +16.5%
+📝 Summary: Strong week driven by enterprise renewals.
+💡 Insight: Average deal size grew while deal count stayed flat.
+🎯 Recommendation: Focus outreach on mid-market accounts this week."""
+
+
+def legacy_parse(report_text):
+    # The loop chat.py ran on every rerun before report_parser existed
+    deals = 0
+    revenue = 0
+    wow_change = "0%"
+    for line in report_text.split('\n'):
+        if "Won Deals:" in line or "Closed Deals:" in line:
+            numbers = re.findall(r'\d+', line)
+            if numbers:
+                deals = int(numbers[0])
+        if "Latest:" in line:
+            numbers = re.findall(r'\d+', line.split('Latest:')[1].split('|')[0] if '|' in line else line)
+            if numbers:
+                revenue = int(numbers[0])
+        elif "Closed Revenue:" in line:
+            numbers = re.findall(r'\d+', line)
+            if numbers:
+                revenue = int(numbers[0])
+        if "WoW:" in line:
+            percentages = re.findall(r'-?\d+%', line)
+            if percentages:
+                wow_change = percentages[0]
+    insights = [line.strip() for line in report_text.split('\n')
+                if any(label in line for label in ("Latest:", "Summary:", "Insight:", "Recommendation:"))]
+    return deals, revenue, wow_change, insights
+
+
+def large_report(lines=20000):
+    # Many per-rep breakdown lines around the real summary
+    rng = random.Random(0)
+    body = [f"• Rep {i}: {rng.randint(0, 40)} deals, ${rng.randint(1000, 900000):,}" for i in range(lines)]
+    return SAMPLE_REPORT + "\n" + "\n".join(body)
+
+
+def malformed_report(lines=20000):
+    # Labels with missing or garbled values, stray separators and binary-ish noise
+    rng = random.Random(1)
+    junk = ["Won Deals: n/a", "Latest: | Prev: |", "WoW: --%", "Closed Revenue: $,,,", "Insight:",
+            "\x00\x01 Latest:", "||||", "Recommendation: " + "x" * 500, ""]
+    return "\n".join(rng.choice(junk) for _ in range(lines))
+
+
+def bench(name, report, number):
+    legacy = timeit.timeit(lambda: legacy_parse(report), number=number) / number
+    uncached = timeit.timeit(lambda: parse_report_uncached(report), number=number) / number
+    parse_report(report)
+    memoized = timeit.timeit(lambda: parse_report(report), number=number) / number
+    print(f"{name:<12} {len(report) / 1024:>8.0f} KiB  legacy {legacy * 1000:>8.2f} ms  "
+          f"uncached {uncached * 1000:>8.2f} ms  memoized {memoized * 1000:>8.3f} ms")
+
+
+if __name__ == "__main__":
+    bench("sample", SAMPLE_REPORT, 2000)
+    bench("large", large_report(), 20)
+    bench("malformed", malformed_report(), 20)
@@ -0,0 +1,113 @@
+"""Benchmark: what a chat interaction re-executes, full-page rerun vs the chat fragment.
+
+Before the page was split into fragments, every chat interaction (Ask, Clear
+Chat, a suggestion button) reran all of chat.py. Now only the chat fragment
+reruns. Both are measured through AppTest's script runner: the "before"
+figure is a full-app run, the "after" figure a run with the chat fragment
+queued the way a click inside it queues it, so only the fragment executes.
+
+Run from the repo root:  python benchmarks/bench_reruns.py [runs] [chat_turns]
+"""
+import functools
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+import streamlit as st
+import streamlit.testing.v1.local_script_runner as local_script_runner
+from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+from streamlit.testing.v1 import AppTest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from chat_history import ASSISTANT, USER, ChatHistory  # noqa: E402
+from report_store import REPORT_STORE  # noqa: E402
+from sample_data import sample_report  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "chat.py")
+
+FRAGMENT_TIMES = defaultdict(list)
+_fragment = st.fragment
+
+
+def timed_fragment(func=None, **kwargs):
+    # Stand-in for st.fragment that records how long each fragment body takes
+    def decorate(body):
+        key = kwargs.get("key") or body.__name__
+
+        @functools.wraps(body)
+        def timed(*args, **inner_kwargs):
+            started = time.perf_counter()
+            try:
+                return body(*args, **inner_kwargs)
+            finally:
+                FRAGMENT_TIMES[key].append(time.perf_counter() - started)
+        return _fragment(timed, **kwargs)
+    return decorate(func) if func is not None else decorate
+
+
+def sample_history(turns):
+    history = ChatHistory()
+    for turn in range(turns):
+        history.add(USER, f"Question {turn} about the pipeline?")
+        history.add(ASSISTANT, "A reasonably long answer. " * 20, ttft=0.4, total_time=3.2)
+    return history
+
+
+def fragment_runs(app, key, runs):
+    # AppTest has no public way to rerun one fragment, so queue it on every rerun
+    # request, as the browser does for a widget inside it. Uses AppTest internals
+    # (the fragment storage, RerunData in local_script_runner) as of Streamlit 1.65
+    fragment_id = next(iter(app._fragment_storage._ids_by_target_key[key]))
+    local_script_runner.RerunData = functools.partial(RerunData, fragment_id_queue=[fragment_id])
+    try:
+        return timed_runs(app, runs)
+    finally:
+        local_script_runner.RerunData = RerunData
+
+
+def timed_runs(app, runs):
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        app.run()
+        times.append(time.perf_counter() - started)
+        assert not app.exception, app.exception
+    return times
+
+
+def ms(values):
+    return f"p50 {statistics.median(values) * 1000:7.1f} ms  max {max(values) * 1000:7.1f} ms"
+
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    turns = int(sys.argv[2]) if len(sys.argv) > 2 else 10
+
+    st.fragment = timed_fragment
+    try:
+        app = AppTest.from_file(APP_PATH, default_timeout=30)
+        app.session_state.report_key = REPORT_STORE.put(sample_report())
+        app.session_state.report_count = 1
+        app.run()
+        app.session_state.chat_history = sample_history(turns)
+        # The chatbot only renders with an API key; nothing here calls the model
+        app.sidebar.text_input[-1].set_value("sk-benchmark").run()
+
+        FRAGMENT_TIMES.clear()
+        full = timed_runs(app, runs)
+        full_bodies = dict(FRAGMENT_TIMES)
+        FRAGMENT_TIMES.clear()
+        fragment = fragment_runs(app, "chat", runs)
+        assert set(FRAGMENT_TIMES) == {"chat"}, f"fragment rerun ran {sorted(FRAGMENT_TIMES)}"
+    finally:
+        st.fragment = _fragment
+
+    print(f"{runs} runs, {turns} chat turns")
+    print(f"before: full page rerun    {ms(full)}")
+    print(f"  chat fragment body       {ms(full_bodies['chat'])}")
+    print(f"  quick stats body         {ms(full_bodies['quick_stats'])}")
+    print(f"after: chat fragment rerun {ms(fragment)}")
+    print(f"speedup                    {statistics.median(full) / statistics.median(fragment):.1f}x")
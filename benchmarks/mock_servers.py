@@ -0,0 +1,221 @@
+"""Local stand-ins for the n8n webhook and the OpenAI chat-completions API.
+
+    python benchmarks/mock_servers.py --latency 2 --jitter 1 --error-rate 0.05
+
+Then start the app against them:
+
+    N8N_BASE_URL=http://127.0.0.1:5678 OPENAI_BASE_URL=http://127.0.0.1:5679/v1 streamlit run chat.py
+
+The webhook answers with the same Slack-shaped JSON the real workflow
+returns (``message.text`` built by sample_data.sample_report), with
+configurable latency and 500/404 rates. The chat endpoint returns canned
+answers, streamed as server-sent events when asked, with token usage.
+"""
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sample_data import sample_report  # noqa: E402
+
+WEBHOOK_PATH = "/webhook/madison-sales-webhook"
+CHAT_PATH = "/v1/chat/completions"
+
+FAKE_ANSWER = (
+    "Revenue is trending up on the previous period, driven by a handful of larger deals. "
+    "Deal count is flat, so growth is coming from deal size rather than volume. "
+    "Keep an eye on the win rate and focus outreach on mid-market accounts this week."
+)
+
+
+class MockConfig:
+    """Shared, mutable behaviour of both mock servers (seconds and fractions)."""
+
+    def __init__(self, latency=1.0, jitter=0.5, error_rate=0.0, not_found_rate=0.0,
+                 chat_latency=0.5, token_delay=0.01, seed=None, padding_bytes=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.not_found_rate = not_found_rate
+        self.chat_latency = chat_latency
+        self.token_delay = token_delay
+        self.padding_bytes = padding_bytes
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = {}
+
+    def count(self, name):
+        with self.lock:
+            self.requests[name] = self.requests.get(name, 0) + 1
+
+    def webhook_delay(self):
+        with self.lock:
+            return max(0.0, self.latency + self.random.uniform(-self.jitter, self.jitter))
+
+    def webhook_status(self):
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.error_rate:
+            return 500
+        if roll < self.error_rate + self.not_found_rate:
+            return 404
+        return 200
+
+
+def fake_report(payload):
+    # Deterministic per payload, so identical requests get identical reports
+    seed = int(hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:8], 16)
+    return sample_report(random.Random(seed),
+                         date.fromisoformat(payload.get("start_date", "2024-05-01")),
+                         date.fromisoformat(payload.get("end_date", "2024-05-07")))
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    config = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        try:
+            return json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return {}
+
+    def do_GET(self):
+        if self.path == "/healthz":
+            self.config.count("healthz")
+            self._send_json(200, {"status": "ok"})
+        else:
+            self._send_json(404, {"code": 404, "message": "not found"})
+
+    def do_POST(self):
+        body = self._read_json()
+        if self.path == WEBHOOK_PATH:
+            self._webhook(body)
+        elif self.path == CHAT_PATH:
+            self._chat(body)
+        else:
+            self._send_json(404, {"code": 404, "message": "not found"})
+
+    def _webhook(self, payload):
+        self.config.count("webhook")
+        time.sleep(self.config.webhook_delay())
+        status = self.config.webhook_status()
+        if status == 500:
+            self._send_json(500, {"message": "Error in workflow", "node": "Airtable", "mock": True})
+        elif status == 404:
+            self._send_json(404, {"code": 404, "message": "The requested webhook is not registered."})
+        else:
+            channel = payload.get("slack_channel", "#sales-reports")
+            self._send_json(200, {
+                "ok": True,
+                "channel": channel,
+                "ts": f"{time.time():.6f}",
+                "message_timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "message": {"type": "message", "text": fake_report(payload)},
+                # Stands in for the per-node execution data some workflows echo back
+                "execution_data": [{"node": f"Item {i}", "json": {"value": "x" * 80}}
+                                   for i in range(self.config.padding_bytes // 120)]
+            })
+
+    def _chat(self, request):
+        self.config.count("chat")
+        time.sleep(self.config.chat_latency)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4
+        words = FAKE_ANSWER.split(" ")
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(words),
+                 "total_tokens": prompt_tokens + len(words)}
+        base = {"id": "chatcmpl-mock", "created": int(time.time()), "model": request.get("model", "gpt-4")}
+
+        if not request.get("stream"):
+            self._send_json(200, {
+                **base,
+                "object": "chat.completion",
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": FAKE_ANSWER}}],
+                "usage": usage
+            })
+            return
+
+        # Server-sent events, one word per chunk, then the usage chunk
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        chunk = {**base, "object": "chat.completion.chunk"}
+        for i, word in enumerate(words):
+            delta = {"content": word if i == 0 else " " + word}
+            self._event({**chunk, "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+            time.sleep(self.config.token_delay)
+        self._event({**chunk, "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]})
+        if request.get("stream_options", {}).get("include_usage"):
+            self._event({**chunk, "choices": [], "usage": usage})
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+        self.close_connection = True
+
+    def _event(self, body):
+        self.wfile.write(f"data: {json.dumps(body)}\n\n".encode())
+        self.wfile.flush()
+
+
+def start_server(config, host="127.0.0.1", port=0):
+    # Serves both the webhook and the chat API; port 0 picks a free port
+    handler = type("ConfiguredMockHandler", (MockHandler,), {"config": config})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="mock-server", daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5678, help="n8n stand-in port")
+    parser.add_argument("--openai-port", type=int, default=5679, help="chat-completions stand-in port")
+    parser.add_argument("--latency", type=float, default=1.0, help="mean webhook latency (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="+/- uniform jitter on the latency (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of webhook calls returning 500")
+    parser.add_argument("--not-found-rate", type=float, default=0.0, help="fraction returning 404")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="delay before the first token (s)")
+    parser.add_argument("--token-delay", type=float, default=0.01, help="delay between streamed words (s)")
+    parser.add_argument("--padding-bytes", type=int, default=0,
+                        help="roughly this much extra execution data in each webhook response")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    config = MockConfig(args.latency, args.jitter, args.error_rate, args.not_found_rate,
+                        args.chat_latency, args.token_delay, args.seed, args.padding_bytes)
+    n8n = start_server(config, args.host, args.port)
+    openai = start_server(config, args.host, args.openai_port)
+    print(f"n8n stand-in:    http://{args.host}:{n8n.server_port}{WEBHOOK_PATH}", file=sys.stderr)
+    print(f"OpenAI stand-in: http://{args.host}:{openai.server_port}/v1", file=sys.stderr)
+    try:
+        while True:
+            time.sleep(60)
+            print(f"requests so far: {config.requests}", file=sys.stderr)
+    except KeyboardInterrupt:
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
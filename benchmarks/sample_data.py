@@ -0,0 +1,44 @@
+"""Sample sales metrics and Slack report text shared by the benchmarks and mock servers."""
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from analytics import SalesMetrics, format_report  # noqa: E402
+
+START_DATE = date(2024, 5, 1)
+END_DATE = date(2024, 5, 7)
+
+# The commentary lines the workflow's model adds under the metrics
+COMMENTARY = [
+    "💡 Insight: Average deal size moved more than deal count this period.",
+    "🎯 Recommendation: Prioritise follow-ups on open mid-market opportunities."
+]
+
+
+def sample_metrics(rng=None, start_date=START_DATE, end_date=END_DATE):
+    # Fixed figures, or plausible random ones drawn from ``rng``
+    if rng is None:
+        return SalesMetrics(
+            start_date=start_date, end_date=end_date, deals=42, revenue=1_284_500,
+            avg_deal_size=30_583, prev_deals=39, prev_revenue=1_102_300, wow_change=16.5, win_rate=62.5
+        )
+    deals = rng.randint(5, 120)
+    revenue = deals * rng.uniform(8_000, 40_000)
+    prev_revenue = revenue * rng.uniform(0.7, 1.3)
+    return SalesMetrics(
+        start_date=start_date,
+        end_date=end_date,
+        deals=deals,
+        revenue=revenue,
+        avg_deal_size=revenue / deals,
+        prev_deals=rng.randint(5, 120),
+        prev_revenue=prev_revenue,
+        wow_change=(revenue - prev_revenue) / prev_revenue * 100,
+        win_rate=rng.uniform(20, 80)
+    )
+
+
+def sample_report(rng=None, start_date=START_DATE, end_date=END_DATE):
+    return "\n".join([format_report(sample_metrics(rng, start_date, end_date)), *COMMENTARY])
@@ -1,8 +1,41 @@
 import streamlit as st
-import requests
+from streamlit.errors import StreamlitAPIException
 from datetime import datetime, timedelta
-import json
-import re
+import functools
+import os
+import sqlite3
+import sys
+import time
+from dataclasses import asdict
+from analytics import DEAL_EXPORT_DIR, DealSet, compute_metrics, format_report, list_exports, resolve_export
+from answer_cache import AnswerCache
+from assistant import AnswerStats, complete_answer, stream_answer
+from chat_context import ConversationContext
+from chat_history import ASSISTANT, CACHED, PREFETCHED, USER, ChatHistory
+from health import CircuitBreaker, HealthProbe
+from jobs import JobManager, DONE, FAILED, QUEUED, RUNNING
+from n8n_client import (
+    BACKGROUND_TIMEOUT, HEALTH_URL, WEBHOOK_URL, build_payload, format_json, generate_report, new_outcome
+)
+from prefetch import SUGGESTED_QUESTIONS, AnswerPrefetcher
+from query_router import LOCAL, QueryRouter
+from report_cache import ReportCache, payload_key
+from report_history import DEFAULT_PAGE_SIZE, ReportHistory
+from report_parser import parse_report
+from report_store import REPORT_STORE
+from rollups import ExportRollups
+from singleflight import SingleFlight
+from telemetry import TELEMETRY
+from transport import create_http_session, create_openai_client
+from warmer import PRESETS, WARM_CHANNEL, WARM_SCHEDULE, PresetWarmer
+
+# How often a waiting session re-checks its background report job; only the
+# progress fragment reruns, so this can be short
+JOB_POLL_SECONDS = 0.5
+# How long a suggestion click waits for an answer that's still being prefetched
+PREFETCH_WAIT_SECONDS = 60
+# Characters of raw response shown per page
+RAW_PAGE_CHARS = 20_000
 
 # Page configuration
 st.set_page_config(
@@ -11,13 +44,157 @@ st.set_page_config(
     layout="wide"
 )
 
+# Shared across all sessions in this server process
+@st.cache_resource
+def get_report_cache():
+    return ReportCache()
+
+@st.cache_resource
+def get_job_manager():
+    return JobManager()
+
+@st.cache_resource
+def get_report_flight():
+    return SingleFlight()
+
+@st.cache_resource
+def get_report_history():
+    # Survives refreshes and restarts, unlike session_state
+    return ReportHistory()
+
+@st.cache_resource
+def get_http_session():
+    # One keep-alive connection pool to n8n for the whole process
+    return create_http_session()
+
+@st.cache_resource(max_entries=32)
+def get_openai_client(api_key):
+    # Reused across reruns so the connection pool and TLS session survive
+    return create_openai_client(api_key)
+
+@st.cache_resource
+def get_answer_cache():
+    return AnswerCache()
+
+@st.cache_resource
+def get_query_router():
+    return QueryRouter()
+
+@st.cache_resource
+def get_answer_prefetcher():
+    return AnswerPrefetcher()
+
+@st.cache_resource
+def get_circuit_breaker():
+    return CircuitBreaker()
+
+@st.cache_resource
+def get_health_probe():
+    return HealthProbe(HEALTH_URL, breaker=get_circuit_breaker()).start()
+
+def call_webhook_guarded(payload, http_session, breaker):
+    # Skip the network entirely while the breaker is open
+    if not breaker.allow():
+        return new_outcome(payload, status="circuit_open")
+    outcome = generate_report(payload, timeout=BACKGROUND_TIMEOUT, session=http_session)
+    breaker.record_outcome(outcome)
+    return outcome
+
+def save_to_history(report_history, payload, outcome, source="workflow"):
+    # Best effort: a locked or full database must not cost the user their report
+    if not outcome["slack_message_text"]:
+        return None
+    try:
+        return report_history.save(payload, outcome["slack_message_text"], outcome["result"], source)
+    except sqlite3.Error:
+        return None
+
+def run_report_job(payload, cache_key, report_cache, report_flight, http_session, breaker,
+                   report_history, force_refresh=False):
+    # Runs on the job pool, outside any Streamlit session. Sessions asking for the
+    # same report while this runs are handed this job's id (JobManager.submit(key=...)).
+    # A job queued behind a preset warm of the same payload can pick up its cached result
+    if not force_refresh:
+        cached = report_cache.get(cache_key)
+        if cached:
+            return cached.value
+
+    # A warm of the same payload already in flight shares its webhook call
+    outcome, shared = report_flight.do(cache_key, call_webhook_guarded, payload, http_session, breaker)
+    if outcome["status"] == "success" and not shared:
+        report_cache.put(cache_key, outcome)
+        save_to_history(report_history, payload, outcome)
+    return outcome
+
+def warm_preset(report_cache, report_flight, http_session, breaker, report_history, payload, ttl_seconds):
+    # Runs on the warmer thread; the warmed report stays cached until the next scheduled run
+    cache_key = payload_key(payload)
+    outcome, shared = report_flight.do(cache_key, call_webhook_guarded, payload, http_session, breaker)
+    if outcome["status"] == "success" and not shared:
+        report_cache.put(cache_key, outcome, ttl_seconds=ttl_seconds)
+        save_to_history(report_history, payload, outcome, source="warmer")
+    return outcome
+
+def restore_preset(report_cache, report_history, payload, max_age):
+    # Re-cache a preset warmed before a restart instead of re-running (and re-posting) it
+    cache_key = payload_key(payload)
+    entry = report_history.latest(cache_key, since=time.time() - max_age)
+    loaded = report_history.load(entry.id) if entry else None
+    if not loaded or loaded[1] is None:
+        return None
+    outcome = new_outcome(payload, status="success")
+    outcome["slack_message_text"], outcome["result"] = loaded
+    report_cache.put(cache_key, outcome, ttl_seconds=max_age, created_at=entry.created_at)
+    return entry.created_at
+
+@st.cache_resource
+def get_preset_warmer():
+    # Off unless REPORT_WARM_SCHEDULE is set, since every warm run posts the preset to Slack
+    if not WARM_SCHEDULE:
+        return None
+    report_cache, report_history, job_manager = get_report_cache(), get_report_history(), get_job_manager()
+    warm = functools.partial(warm_preset, report_cache, get_report_flight(), get_http_session(),
+                             get_circuit_breaker(), report_history)
+    restore = functools.partial(restore_preset, report_cache, report_history)
+    # Interactive report jobs go first
+    busy = lambda: any(job_manager.stats()[state] for state in (QUEUED, RUNNING))
+    return PresetWarmer(warm, WARM_SCHEDULE, slack_channel=WARM_CHANNEL, busy=busy, restore=restore).start()
+
+@st.cache_resource(max_entries=4)
+def load_deal_set(path, modified_at):
+    # Keyed on the file's modification time so an updated export is re-read
+    return DealSet.from_path(path)
+
+@st.cache_resource(max_entries=4)
+def get_export_rollups(path):
+    return ExportRollups()
+
+def load_deal_rollups(path, modified_at):
+    # Rows appended to the export since it was last read are added without a rebuild
+    return get_export_rollups(path).update(load_deal_set(path, modified_at))
+
+LOCAL_SOURCE = "Local Deal Export"
+
+def current_report():
+    # Shared with every other session on the same report; reloaded from the history if evicted
+    key = st.session_state.report_key
+    return REPORT_STORE.get(key, reload=get_report_history().find_text) if key else None
+
 # Initialize session state
 if 'chat_history' not in st.session_state:
-    st.session_state.chat_history = []
-if 'report_data' not in st.session_state:
-    st.session_state.report_data = None
+    st.session_state.chat_history = ChatHistory()
+if 'report_key' not in st.session_state:
+    # Content hash of the current report; the text itself lives in REPORT_STORE
+    st.session_state.report_key = None
 if 'report_count' not in st.session_state:
     st.session_state.report_count = 0
+if 'chat_context' not in st.session_state:
+    st.session_state.chat_context = ConversationContext()
+if 'report_job' not in st.session_state:
+    st.session_state.report_job = None
+if 'history_cursors' not in st.session_state:
+    # before_id of each history page visited, newest page first
+    st.session_state.history_cursors = [None]
 
 # Header with branding
 st.title("📊 Weekly Sales Report Generator")
@@ -31,16 +208,32 @@ with st.sidebar:
     # Date range selector
     report_type = st.selectbox(
         "Select Report Period",
-        ["Last 7 Days", "Last 30 Days", "Custom Range"]
+        [*PRESETS, "Custom Range"]
     )
     
     if report_type == "Custom Range":
         start_date = st.date_input("Start Date", value=datetime.now() - timedelta(days=7))
         end_date = st.date_input("End Date", value=datetime.now())
     else:
-        days = 7 if report_type == "Last 7 Days" else 30
+        days = PRESETS[report_type]
         end_date = datetime.now()
         start_date = end_date - timedelta(days=days)
+        
+        # Freshness of the scheduled copy of this preset (default filters only)
+        preset_warmer = get_preset_warmer()
+        if preset_warmer:
+            warm_status = preset_warmer.status()[report_type]
+            next_refresh = preset_warmer.next_run_at
+            next_text = f" · next refresh {next_refresh:%H:%M}" if next_refresh else ""
+            if warm_status["warmed_at"]:
+                st.caption(
+                    f"🔥 Prewarmed at {datetime.fromtimestamp(warm_status['warmed_at']):%H:%M} "
+                    f"({(time.time() - warm_status['warmed_at']) / 60:.0f} min ago) for the default filters{next_text}"
+                )
+            elif warm_status["status"]:
+                st.caption(f"🔥 Last prewarm failed ({warm_status['status']}){next_text}")
+            else:
+                st.caption(f"🔥 Prewarming scheduled{next_text}")
     
     # Additional filters
     st.subheader("Filters")
@@ -64,6 +257,48 @@ with st.sidebar:
         help="Enter the Slack channel where you want to receive the report"
     )
     
+    # Where the numbers come from
+    # Local exports are offered only from the server's DEAL_EXPORT_DIR, never an arbitrary path
+    data_source = st.radio(
+        "Data Source",
+        ["n8n Workflow", LOCAL_SOURCE] if DEAL_EXPORT_DIR else ["n8n Workflow"],
+        help="Compute the report locally from a CRM export instead of running the n8n workflow"
+    )
+    deal_file = None
+    if data_source == LOCAL_SOURCE:
+        deal_file = st.selectbox(
+            "Deal Export File",
+            list_exports(),
+            index=None,
+            placeholder="Choose an export",
+            help="CSV, Parquet, JSONL or an Airtable JSON export with close date, amount and status columns"
+        )
+    
+    force_refresh = st.checkbox(
+        "Force refresh",
+        value=False,
+        help="Skip the report cache and re-run the n8n workflow (also re-posts to Slack)"
+    )
+    
+    # n8n health and circuit breaker state
+    probe = get_health_probe()
+    breaker_state = get_circuit_breaker().snapshot()
+    if probe.healthy is None:
+        st.caption("🩺 n8n: checking...")
+    elif probe.healthy:
+        st.caption(f"🩺 n8n: 🟢 up ({probe.latency * 1000:.0f} ms)")
+    else:
+        st.caption(f"🩺 n8n: 🔴 down ({probe.error})")
+    breaker_labels = {"closed": "🟢 closed", "open": "🔴 open", "half_open": "🟡 half-open"}
+    st.caption(f"🔌 Circuit breaker: {breaker_labels[breaker_state['state']]}")
+    
+    # Sessions that joined a running report job, plus jobs that shared a preset warm's call
+    flight_stats = get_report_flight().stats()
+    st.caption(
+        f"🔁 Webhook calls saved by deduplication: {get_job_manager().joined + flight_stats['saved']} "
+        f"({flight_stats['in_flight']} in flight)"
+    )
+    
     # OpenAI API Key input
     st.divider()
     st.subheader("🤖 AI Settings")
@@ -72,6 +307,23 @@ with st.sidebar:
         type="password",
         help="Enter your OpenAI API key to enable the chatbot"
     )
+    stream_responses = st.toggle(
+        "Stream responses",
+        value=True,
+        help="Show the answer word by word as it's generated"
+    )
+    
+    answer_stats = get_answer_cache().stats()
+    st.caption(
+        f"♻️ Answer cache: {answer_stats['exact_hits'] + answer_stats['similar_hits']} hits, "
+        f"{answer_stats['misses']} misses ({answer_stats['hit_rate']:.0%} hit rate)"
+    )
+    router_stats = get_query_router().stats()
+    st.caption(
+        f"🧮 Answered from report numbers: {router_stats['local']} of "
+        f"{router_stats['local'] + router_stats['model']} questions, "
+        f"~{router_stats['seconds_saved']:.0f}s of model time saved"
+    )
 
 # Main content area
 col1, col2 = st.columns([2, 1])
@@ -90,240 +342,508 @@ with col1:
     Simply configure your preferences and click "Generate Report" below!
     """)
 
-with col2:
-    st.header("📈 Quick Stats")
-    
-    if st.session_state.report_data:
-        # Parse current report data
-        report_text = st.session_state.report_data
+# Fragments rerun on their own, so chat interactions don't re-execute Quick Stats,
+# the report preview or the rest of the page
+@st.fragment(key="quick_stats")
+def render_quick_stats():
+    report_text = current_report()
+    if report_text:
         
         try:
-            # Extract metrics
-            deals = 0
-            revenue = 0
-            wow_change = "0%"
-            
-            for line in report_text.split('\n'):
-                # Extract deals
-                if "Won Deals:" in line or "Closed Deals:" in line:
-                    numbers = re.findall(r'\d+', line)
-                    if numbers:
-                        deals = int(numbers[0])
-                
-                # Extract revenue (look for Latest: or Closed Revenue:)
-                if "Latest:" in line:
-                    numbers = re.findall(r'\d+', line.split('Latest:')[1].split('|')[0] if '|' in line else line)
-                    if numbers:
-                        revenue = int(numbers[0])
-                elif "Closed Revenue:" in line:
-                    numbers = re.findall(r'\d+', line)
-                    if numbers:
-                        revenue = int(numbers[0])
-                
-                # Extract WoW change
-                if "WoW:" in line:
-                    percentages = re.findall(r'-?\d+%', line)
-                    if percentages:
-                        wow_change = percentages[0]
+            # Extract metrics (parsed once per report and shared with Key Insights)
+            metrics = parse_report(report_text)
             
             # Display dynamic metrics
             st.metric(
                 "Reports Generated",
-                st.session_state.report_count,
-                delta="+1" if st.session_state.report_count > 1 else None
+                get_report_history().count(),
+                delta=f"+{st.session_state.report_count} this session" if st.session_state.report_count else None
             )
             st.metric(
                 "Total Deals Closed",
-                f"{deals:,}"
+                f"{metrics.deals:,}"
             )
             st.metric(
                 "Current Revenue",
-                f"${revenue:,.0f}"
+                f"${metrics.revenue:,.0f}"
             )
             st.metric(
                 "Week-over-Week",
-                wow_change
+                metrics.wow_change
             )
         
         except Exception as e:
             # Fallback to simple stats
-            st.metric("Reports Generated", st.session_state.report_count)
+            st.metric("Reports Generated", get_report_history().count())
             st.metric("Status", "✅ Active")
             st.metric("Last Report", "Just Now")
     
     else:
-        # Initial state - no reports yet
-        st.metric("Reports Generated", "0")
+        # Initial state - no report loaded in this session yet
+        st.metric("Reports Generated", get_report_history().count())
         st.metric("Ready to Start", "✅")
         st.metric("Next Action", "Generate Report")
 
+with col2:
+    st.header("📈 Quick Stats")
+    render_quick_stats()
+
 st.divider()
 
+@st.fragment(key="report_preview")
+@TELEMETRY.timed("render")
+def render_report_outcome(outcome, slack_channel):
+    status = outcome["status"]
+
+    if status == "success":
+        result = outcome["result"]
+        slack_message_text = outcome["slack_message_text"]
+        channel_info = outcome["channel"]
+
+        # Display success message
+        st.success("✅ Report generated successfully!")
+
+        # Display the Slack message
+        if slack_message_text:
+            st.subheader("📬 Slack Message Preview")
+            if result.get("source") == "local":
+                st.markdown("**Computed locally from the deal export (not sent to Slack):**")
+            else:
+                st.markdown("**Message sent to Slack:**")
+
+            # Display the message in a code block to preserve formatting
+            st.code(slack_message_text, language=None)
+
+            # Show channel and timestamp info
+            col_a, col_b = st.columns(2)
+            with col_a:
+                if result.get("source") == "local":
+                    st.info(f"📁 Source: `{result['file']}` ({result['deal_records']:,} deal records)")
+                else:
+                    st.success(f"✅ Delivered to channel: `{channel_info}`")
+            with col_b:
+                if 'message_timestamp' in result:
+                    st.info(f"🕐 Timestamp: {result['message_timestamp']}")
+
+            # Try to extract metrics from the message text
+            st.divider()
+            st.subheader("📊 Key Insights")
+
+            # Same parsed metrics the Quick Stats panel uses
+            metrics = parse_report(slack_message_text)
+            if metrics.has_trend:
+                insight_styles = {
+                    "latest": (st.info, "📈"),
+                    "summary": (st.success, "📝"),
+                    "insight": (st.warning, "💡"),
+                    "recommendation": (st.info, "🎯")
+                }
+                for kind, line in metrics.insight_lines:
+                    show, icon = insight_styles[kind]
+                    show(f"{icon} {line}")
+            
+            st.markdown("---")
+            st.markdown("**Full pipeline trend analysis has been generated and sent to your team!**")
+
+        else:
+            # Fallback if we can't find the message
+            st.info("✅ Report has been generated and sent to Slack")
+
+            if 'ok' in result and result['ok']:
+                st.success(f"📬 Successfully delivered to channel: `{result.get('channel', slack_channel)}`")
+
+        # Show full response for debugging
+        # Tracks open/closed state, so the raw JSON is only serialized while it's open
+        raw_response = st.expander("📄 View Full API Response", key="raw_api_response", on_change="rerun")
+        with raw_response:
+            if raw_response.open:
+                render_raw_response(result, outcome)
+            else:
+                st.caption("Open to load the raw workflow response.")
+
+    elif status == "server_error":
+        st.error("❌ Error: Workflow encountered an error (Status 500)")
+
+        if outcome["error_detail"] is not None:
+            render_body_preview(format_json(outcome["error_detail"]), outcome, language="json")
+        else:
+            render_body_preview(outcome["text"], outcome)
+
+        st.warning("💡 **Troubleshooting Tips:**")
+        st.markdown("""
+        1. Check that your n8n workflow is **activated** (toggle in top-right)
+        2. Verify all nodes in the workflow are properly configured
+        3. Check the n8n execution logs for detailed error messages
+        4. Ensure your Airtable and Slack credentials are valid
+        5. Make sure the webhook path is correct: `madison-sales-webhook`
+        """)
+
+    elif status == "not_found":
+        st.error("❌ Error: Webhook not found (Status 404)")
+        st.markdown("""
+        **The webhook is not registered. This usually means:**
+        - Your n8n workflow is **not activated** (check the toggle in top-right)
+        - The webhook path doesn't match: should be `madison-sales-webhook`
+        - n8n needs a few seconds after activation to register the webhook
+        
+        **To fix:**
+        1. Go to n8n and make sure the workflow is **activated** (green toggle)
+        2. Wait 3-5 seconds after activating
+        3. Try again
+        """)
+
+    elif status == "unexpected_status":
+        st.error(f"❌ Error: Unexpected status code {outcome['status_code']}")
+        render_body_preview(outcome["text"], outcome)
+
+    elif status == "response_too_large":
+        st.error(f"❌ {outcome['error']}, so it was not loaded")
+        st.info(
+            "Trim the workflow's response (the app only needs `message.text` and `channel`), or raise "
+            "the limit with the `N8N_MAX_RESPONSE_BYTES` environment variable."
+        )
+
+    elif status == "timeout":
+        st.warning("⏱️ Request timed out. The workflow may still be processing. Check your Slack channel in a few moments.")
+        st.info("If the report doesn't appear in Slack, the workflow may have encountered an issue.")
+
+    elif status in ("connection_error", "circuit_open"):
+        if status == "circuit_open":
+            retry_in = get_circuit_breaker().snapshot()["retry_in"]
+            st.error("❌ n8n is unavailable: recent requests kept failing, so this one was not sent")
+            if retry_in:
+                st.caption(f"The next attempt will be let through in about {retry_in:.0f}s.")
+        else:
+            st.error("❌ Connection Error: Could not reach n8n server")
+        st.markdown("""
+        **Possible causes:**
+        - n8n is not running at `http://localhost:5678`
+        - Workflow is not activated
+        - Incorrect webhook URL
+        
+        **To fix:**
+        1. Make sure n8n is running (check http://localhost:5678 in your browser)
+        2. Verify the workflow is activated (green toggle in n8n)
+        3. Confirm the webhook path matches: `madison-sales-webhook`
+        """)
+
+    else:
+        st.error(f"❌ An unexpected error occurred: {outcome['error']}")
+        st.info("Please check that your n8n workflow is active and the webhook URL is correct.")
+
+
+def render_body_preview(text, outcome, language=None):
+    # Error bodies are shown as a bounded preview
+    if len(text) > RAW_PAGE_CHARS:
+        st.code(text[:RAW_PAGE_CHARS], language=language)
+        st.caption(f"✂️ Showing the first {RAW_PAGE_CHARS:,} of {len(text):,} characters.")
+    else:
+        st.code(text, language=language)
+    if outcome.get("truncated"):
+        st.caption(f"✂️ The response body was cut off after {outcome['response_bytes']:,} bytes.")
+
+
+def render_raw_response(result, outcome):
+    # One page of pretty-printed JSON at a time instead of a full st.json tree
+    raw = format_json(result)
+    pages = max(1, -(-len(raw) // RAW_PAGE_CHARS))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                               key="raw_api_response_page")
+    st.code(raw[(page - 1) * RAW_PAGE_CHARS:page * RAW_PAGE_CHARS], language="json")
+    st.caption(
+        f"{outcome.get('response_bytes') or len(raw):,} bytes received"
+        + (f" · page {page} of {pages}" if pages > 1 else "")
+    )
+
+
+def apply_report_outcome(outcome):
+    # Store report data in session state for chatbot and stats
+    if outcome["slack_message_text"]:
+        st.session_state.report_key = REPORT_STORE.put(outcome["slack_message_text"])
+        st.session_state.report_count += 1
+        st.session_state.loaded_report_id = None
+
+
+def run_local_report(payload, deal_file):
+    # Same filters as the webhook payload, computed in-process from the export
+    try:
+        path = resolve_export(deal_file)
+        modified_at = os.path.getmtime(path)
+        deal_set = load_deal_set(path, modified_at)
+        rollups = load_deal_rollups(path, modified_at)
+        # Daily rollups answer any range instantly; odd minimum values fall back to a full scan
+        with TELEMETRY.span("local_metrics"):
+            if rollups.supports(min_deal_value):
+                metrics = rollups.metrics(start_date, end_date, min_deal_value, deal_status)
+            else:
+                metrics = compute_metrics(deal_set, start_date, end_date, min_deal_value, deal_status)
+    except OSError:
+        # No OS details: they'd tell a visitor more about the server's files than they need
+        st.error("❌ Could not read the deal export")
+        return
+    except ValueError as e:
+        st.error(f"❌ Could not read the deal export: {str(e)}")
+        return
+    
+    outcome = new_outcome(payload, status="success")
+    outcome["slack_message_text"] = format_report(metrics)
+    outcome["result"] = {
+        "source": "local",
+        "file": deal_file,
+        "deal_records": len(deal_set),
+        "metrics": asdict(metrics)
+    }
+    save_to_history(get_report_history(), payload, outcome, source="local")
+    apply_report_outcome(outcome)
+    render_report_outcome(outcome, slack_channel)
+
+
+def run_workflow_report(payload):
+    # Show what we're sending (for debugging)
+    with st.expander("🔍 Debug: Request Details"):
+        st.json(payload)
+        st.code(f"POST {WEBHOOK_URL}", language="bash")
+    
+    # Serve identical reports from the shared cache unless a refresh was requested
+    report_cache = get_report_cache()
+    cache_key = payload_key(payload)
+    cached = None if force_refresh else report_cache.get(cache_key)
+    
+    breaker = get_circuit_breaker()
+    
+    if cached:
+        st.caption(
+            f"⚡ Served from cache (generated at {datetime.fromtimestamp(cached.created_at):%H:%M}, "
+            f"{cached.age / 60:.0f} min ago, not re-sent to Slack)"
+        )
+        apply_report_outcome(cached.value)
+        render_report_outcome(cached.value, slack_channel)
+    elif breaker.rejecting():
+        # n8n has been failing - answer right away instead of waiting on the network
+        render_report_outcome(new_outcome(payload, status="circuit_open"), slack_channel)
+    else:
+        # Hand the webhook call to the job pool and poll for it on the next reruns
+        # Sessions asking for the same report while it runs share one job
+        job_id = get_job_manager().submit(
+            run_report_job, payload, cache_key, report_cache, get_report_flight(),
+            get_http_session(), breaker, get_report_history(), force_refresh, key=cache_key
+        )
+        st.session_state.report_job = {"id": job_id, "slack_channel": slack_channel}
+
+
 # Main action button
 if st.button("🚀 Generate Sales Report", type="primary", use_container_width=True):
     # Clear previous chat history when generating new report
-    st.session_state.chat_history = []
+    st.session_state.chat_history.clear()
+    st.session_state.chat_context.reset()
     
-    with st.spinner("🔄 Processing your request... This may take 15-30 seconds"):
-        
-        try:
-            # Prepare payload for n8n webhook
-            payload = {
-                "start_date": start_date.strftime("%Y-%m-%d"),
-                "end_date": end_date.strftime("%Y-%m-%d"),
-                "min_deal_value": min_deal_value,
-                "deal_status": deal_status,
-                "slack_channel": slack_channel
-            }
-            
-            # Call your n8n webhook
-            webhook_url = "http://localhost:5678/webhook/madison-sales-webhook"
-            
-            # Show what we're sending (for debugging)
-            with st.expander("🔍 Debug: Request Details"):
-                st.json(payload)
-                st.code(f"POST {webhook_url}", language="bash")
-            
-            response = requests.post(webhook_url, json=payload, timeout=60)
-            
-            if response.status_code == 200:
-                try:
-                    result = response.json()
-                except:
-                    result = {"success": True, "message": "Workflow executed successfully"}
-                
-                # Display success message
-                st.success("✅ Report generated successfully!")
-                
-                # Extract Slack message text from the response
-                slack_message_text = None
-                channel_info = slack_channel
-                
-                # Handle the Slack API response structure
-                if 'message' in result and isinstance(result['message'], dict):
-                    if 'text' in result['message']:
-                        slack_message_text = result['message']['text']
-                    
-                    # Get channel info
-                    if 'channel' in result:
-                        channel_info = result['channel']
-                
-                # Store report data in session state for chatbot and stats
-                if slack_message_text:
-                    st.session_state.report_data = slack_message_text
-                    st.session_state.report_count += 1
-                
-                # Display the Slack message
-                if slack_message_text:
-                    st.subheader("📬 Slack Message Preview")
-                    st.markdown("**Message sent to Slack:**")
-                    
-                    # Display the message in a code block to preserve formatting
-                    st.code(slack_message_text, language=None)
-                    
-                    # Show channel and timestamp info
-                    col_a, col_b = st.columns(2)
-                    with col_a:
-                        st.success(f"✅ Delivered to channel: `{channel_info}`")
-                    with col_b:
-                        if 'message_timestamp' in result:
-                            st.info(f"🕐 Timestamp: {result['message_timestamp']}")
-                    
-                    # Try to extract metrics from the message text
-                    st.divider()
-                    st.subheader("📊 Key Insights")
-                    
-                    # Parse the message for key metrics
-                    if "Latest:" in slack_message_text and "Prev:" in slack_message_text:
-                        try:
-                            # Extract values from the message
-                            lines = slack_message_text.split('\n')
-                            for line in lines:
-                                if "Latest:" in line:
-                                    st.info(f"📈 {line.strip()}")
-                                elif "Summary:" in line:
-                                    st.success(f"📝 {line.strip()}")
-                                elif "Insight:" in line:
-                                    st.warning(f"💡 {line.strip()}")
-                                elif "Recommendation:" in line:
-                                    st.info(f"🎯 {line.strip()}")
-                        except:
-                            pass
-                    
-                    st.markdown("---")
-                    st.markdown("**Full pipeline trend analysis has been generated and sent to your team!**")
-                
-                else:
-                    # Fallback if we can't find the message
-                    st.info("✅ Report has been generated and sent to Slack")
-                    
-                    if 'ok' in result and result['ok']:
-                        st.success(f"📬 Successfully delivered to channel: `{result.get('channel', slack_channel)}`")
-                
-                # Show full response for debugging
-                with st.expander("📄 View Full API Response"):
-                    st.json(result)
-                
-            elif response.status_code == 500:
-                st.error("❌ Error: Workflow encountered an error (Status 500)")
-                
-                try:
-                    error_detail = response.json()
-                    st.code(json.dumps(error_detail, indent=2), language="json")
-                except:
-                    st.code(response.text)
-                
-                st.warning("💡 **Troubleshooting Tips:**")
-                st.markdown("""
-                1. Check that your n8n workflow is **activated** (toggle in top-right)
-                2. Verify all nodes in the workflow are properly configured
-                3. Check the n8n execution logs for detailed error messages
-                4. Ensure your Airtable and Slack credentials are valid
-                5. Make sure the webhook path is correct: `madison-sales-webhook`
-                """)
-                
-            elif response.status_code == 404:
-                st.error("❌ Error: Webhook not found (Status 404)")
-                st.markdown("""
-                **The webhook is not registered. This usually means:**
-                - Your n8n workflow is **not activated** (check the toggle in top-right)
-                - The webhook path doesn't match: should be `madison-sales-webhook`
-                - n8n needs a few seconds after activation to register the webhook
-                
-                **To fix:**
-                1. Go to n8n and make sure the workflow is **activated** (green toggle)
-                2. Wait 3-5 seconds after activating
-                3. Try again
-                """)
-                
-            else:
-                st.error(f"❌ Error: Unexpected status code {response.status_code}")
-                st.code(response.text)
-                
-        except requests.exceptions.Timeout:
-            st.warning("⏱️ Request timed out. The workflow may still be processing. Check your Slack channel in a few moments.")
-            st.info("If the report doesn't appear in Slack, the workflow may have encountered an issue.")
-            
-        except requests.exceptions.ConnectionError:
-            st.error("❌ Connection Error: Could not reach n8n server")
-            st.markdown("""
-            **Possible causes:**
-            - n8n is not running at `http://localhost:5678`
-            - Workflow is not activated
-            - Incorrect webhook URL
-            
-            **To fix:**
-            1. Make sure n8n is running (check http://localhost:5678 in your browser)
-            2. Verify the workflow is activated (green toggle in n8n)
-            3. Confirm the webhook path matches: `madison-sales-webhook`
-            """)
-            
-        except Exception as e:
-            st.error(f"❌ An unexpected error occurred: {str(e)}")
-            st.info("Please check that your n8n workflow is active and the webhook URL is correct.")
+    # Prepare payload for n8n webhook
+    with TELEMETRY.span("payload_build"):
+        payload = build_payload(start_date, end_date, min_deal_value, deal_status, slack_channel)
+    
+    if data_source == LOCAL_SOURCE:
+        if deal_file:
+            run_local_report(payload, deal_file)
+        else:
+            st.warning("⚠️ Choose a deal export file in the sidebar")
+    else:
+        run_workflow_report(payload)
 
-# AI Chatbot Section - Only show if report has been generated
-if st.session_state.report_data:
+@st.fragment(run_every=JOB_POLL_SECONDS, key="report_job")
+def render_job_progress(job_id):
+    # Reruns on its own until the job finishes, then hands over to a full rerun,
+    # since Quick Stats, the preview and the chatbot all depend on the result
+    job = get_job_manager().get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    # Queued or running - show progress against the usual 15-30 second workflow time
+    st.progress(
+        min(job.elapsed / 30, 0.95),
+        text=f"🔄 Report job `{job.id[:8]}` is {job.state}... {job.elapsed:.0f}s elapsed (usually 15-30 seconds)"
+    )
+
+# Background report job status
+if st.session_state.report_job:
+    job_info = st.session_state.report_job
+    job = get_job_manager().get(job_info["id"])
+    
+    if job is None:
+        st.session_state.report_job = None
+        st.warning("⚠️ The report job is no longer available (the server may have restarted). Please generate the report again.")
+    
+    elif job.state == DONE:
+        st.session_state.report_job = None
+        apply_report_outcome(job.result)
+        render_report_outcome(job.result, job_info["slack_channel"])
+    
+    elif job.state == FAILED:
+        st.session_state.report_job = None
+        st.error(f"❌ An unexpected error occurred: {job.error}")
+        st.info("Please check that your n8n workflow is active and the webhook URL is correct.")
+    
+    else:
+        render_job_progress(job.id)
+
+def rerun_fragment():
+    # Redraw only the calling fragment; fall back to a full rerun when the fragment
+    # is running as part of one (first render, AppTest), where scoping isn't allowed
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
+
+
+def ask_assistant(question, chat_container):
+    # Plain metric lookups ("what was revenue?") are answered from the report itself
+    report_text = current_report()
+    route = get_query_router().route(report_text, question)
+
+    # Serve repeated or reworded questions about the same report without calling the model,
+    # but only with answers this API key paid for
+    report_key = st.session_state.report_key
+    cached = get_answer_cache().lookup(report_key, openai_api_key, question) if route.path != LOCAL else None
+    
+    # Add user message to chat history
+    st.session_state.chat_history.add(USER, question)
+    
+    if route.path == LOCAL:
+        st.session_state.chat_history.add(
+            ASSISTANT, route.answer, source=LOCAL, detail=route.intent, total_time=route.elapsed
+        )
+        rerun_fragment()
+
+    if cached:
+        st.session_state.chat_history.add(
+            ASSISTANT, cached.answer, source=CACHED, detail=cached.similarity
+        )
+        rerun_fragment()
+
+    stats = AnswerStats()
+    answer_stream = None
+    try:
+        # Reuse the pooled OpenAI client for this key
+        client = get_openai_client(openai_api_key)
+
+        # Stable report prefix + rolling summary + recent turns within the token budget
+        messages = st.session_state.chat_context.build_messages(
+            report_text, st.session_state.chat_history
+        )
+
+        # Call OpenAI API
+        if stream_responses:
+            # Render tokens into the chat as they arrive
+            with chat_container:
+                st.markdown(f"**👤 You:** {question}")
+                st.markdown("**🤖 AI Assistant:**")
+                answer_stream = stream_answer(client, messages, stats)
+                ai_response = st.write_stream(answer_stream)
+        else:
+            with st.spinner("🤔 Thinking..."):
+                ai_response = complete_answer(client, messages, stats)
+
+        # Add AI response to chat history
+        st.session_state.chat_history.add(
+            ASSISTANT, ai_response, ttft=stats.time_to_first_token, total_time=stats.total_time
+        )
+        get_answer_cache().store(report_key, openai_api_key, question, ai_response)
+        get_query_router().record_model_latency(stats.total_time)
+
+        # Rerun just the chat fragment to show the answer
+        rerun_fragment()
+
+    except Exception as e:
+        st.error(f"❌ Error: {str(e)}")
+        st.info("Make sure your OpenAI API key is correct and you have credits available")
+
+    finally:
+        # Interrupted mid-stream (rerun, stop, error): close the HTTP stream and
+        # drop the unanswered question so it isn't resent as a dangling turn
+        if answer_stream is not None:
+            answer_stream.close()
+        if not stats.completed and st.session_state.chat_history[-1:] and \
+                st.session_state.chat_history[-1].role == USER:
+            st.session_state.chat_history.pop()
+
+
+def answer_suggestion(question, chat_container):
+    # A prefetched answer (ready, or still being generated) beats a fresh round trip
+    with st.spinner("🤔 Thinking..."):
+        prefetched = get_answer_prefetcher().get(
+            current_report(), openai_api_key, question, timeout=PREFETCH_WAIT_SECONDS
+        )
+    if prefetched is None:
+        ask_assistant(question, chat_container)
+        return
+    
+    answer, generation_time = prefetched
+    st.session_state.chat_history.add(USER, question)
+    st.session_state.chat_history.add(ASSISTANT, answer, source=PREFETCHED, total_time=generation_time)
+    rerun_fragment()
+
+
+def load_history_report(entry):
+    loaded = get_report_history().load(entry.id)
+    if loaded is None:
+        st.warning("⚠️ That report is no longer in the history")
+        return
+    # Same reset as generating a new report, without re-running the workflow
+    st.session_state.report_key = REPORT_STORE.put(loaded[0])
+    st.session_state.loaded_report_id = entry.id
+    st.session_state.chat_history.clear()
+    st.session_state.chat_context.reset()
+    # Quick Stats and the chatbot live outside this fragment
+    st.rerun()
+
+
+@st.fragment(key="history")
+def render_history():
+    # Pages through summaries only; a report body is read when it's loaded
+    history = get_report_history()
+    cursors = st.session_state.history_cursors
+    entries = history.page(before_id=cursors[-1])
+    
+    if not entries and len(cursors) == 1:
+        st.caption("No reports yet. Generated reports are saved here and survive refreshes and restarts.")
+        return
+    
+    for entry in entries:
+        col_a, col_b = st.columns([5, 1])
+        with col_a:
+            current = " · **loaded**" if st.session_state.get("loaded_report_id") == entry.id else ""
+            st.markdown(
+                f"**{entry.start_date} → {entry.end_date}** · {entry.slack_channel or 'local'} · "
+                f"{', '.join(entry.deal_status)} · {entry.deals:,} deals · ${entry.revenue:,.0f} "
+                f"({entry.wow_change}){current}"
+            )
+            st.caption(
+                f"#{entry.id} · {datetime.fromtimestamp(entry.created_at):%Y-%m-%d %H:%M} · {entry.source}"
+                + (f" · min ${entry.min_deal_value:,.0f}" if entry.min_deal_value else "")
+            )
+        with col_b:
+            if st.button("💬 Load", key=f"load_report_{entry.id}"):
+                load_history_report(entry)
+    
+    col_a, col_b, col_c = st.columns([1, 1, 4])
+    with col_a:
+        if len(cursors) > 1 and st.button("◀ Newer"):
+            cursors.pop()
+            rerun_fragment()
+    with col_b:
+        if len(entries) == DEFAULT_PAGE_SIZE and st.button("Older ▶"):
+            cursors.append(entries[-1].id)
+            rerun_fragment()
+    with col_c:
+        stats = history.stats()
+        st.caption(
+            f"{stats['reports']:,} reports · {stats['stored_bytes'] / 1024:,.0f} KB on disk "
+            f"(compressed report text and API responses)"
+        )
+
+
+@st.fragment(key="chat")
+def render_chatbot():
     st.divider()
     st.header("💬 Ask Questions About Your Report")
     st.markdown("*Use the AI chatbot to get deeper insights about your sales data*")
@@ -332,14 +852,28 @@ if st.session_state.report_data:
     if not openai_api_key:
         st.warning("⚠️ Please enter your OpenAI API key in the sidebar to use the chatbot")
     else:
+        # Start answering the suggested questions while the user reads the report
+        report_text = current_report()
+        get_answer_prefetcher().prefetch(report_text, openai_api_key, get_openai_client(openai_api_key))
+        
         # Display chat history
         chat_container = st.container()
         with chat_container:
-            for i, chat in enumerate(st.session_state.chat_history):
-                if chat["role"] == "user":
-                    st.markdown(f"**👤 You:** {chat['content']}")
+            for chat in st.session_state.chat_history:
+                if chat.role == USER:
+                    st.markdown(f"**👤 You:** {chat.content}")
                 else:
-                    st.markdown(f"**🤖 AI Assistant:** {chat['content']}")
+                    st.markdown(f"**🤖 AI Assistant:** {chat.content}")
+                    if chat.source == LOCAL:
+                        st.caption(f"🧮 Answered from the report numbers in {chat.total_time * 1000:.1f} ms")
+                    elif chat.source == PREFETCHED:
+                        st.caption("⚡ Answered instantly from a prefetched response")
+                    elif chat.source == CACHED:
+                        # The matched question may be another session's, so it isn't shown
+                        st.caption(f"♻️ Reused an earlier answer to a similar question (similarity {chat.detail:.2f})")
+                    elif chat.total_time is not None:
+                        ttft_text = f"first token {chat.ttft:.1f}s · " if chat.ttft is not None else ""
+                        st.caption(f"⏱️ {ttft_text}total {chat.total_time:.1f}s")
                 st.markdown("---")
         
         # Chat input
@@ -354,94 +888,31 @@ if st.session_state.report_data:
             ask_button = st.button("🚀 Ask", type="primary")
         with col2:
             if st.button("🗑️ Clear Chat"):
-                st.session_state.chat_history = []
-                st.rerun()
+                st.session_state.chat_history.clear()
+                st.session_state.chat_context.reset()
+                rerun_fragment()
         
         if ask_button and user_question:
-            # Add user message to chat history
-            st.session_state.chat_history.append({
-                "role": "user",
-                "content": user_question
-            })
-            
-            with st.spinner("🤔 Thinking..."):
-                try:
-                    # Import OpenAI
-                    from openai import OpenAI
-                    
-                    # Initialize OpenAI client
-                    client = OpenAI(api_key=openai_api_key)
-                    
-                    # Prepare conversation for OpenAI
-                    messages = [
-                        {
-                            "role": "system",
-                            "content": f"""You are a helpful sales data analyst assistant. You have access to this sales report data:
-
-{st.session_state.report_data}
-
-Answer questions about this data in a clear, concise, and actionable way. Provide specific numbers when relevant. Be friendly and professional."""
-                        }
-                    ]
-                    
-                    # Add chat history
-                    for chat in st.session_state.chat_history:
-                        messages.append({
-                            "role": chat["role"],
-                            "content": chat["content"]
-                        })
-                    
-                    # Call OpenAI API
-                    response = client.chat.completions.create(
-                        model="gpt-4",
-                        messages=messages,
-                        temperature=0.7,
-                        max_tokens=500
-                    )
-                    
-                    # Get AI response
-                    ai_response = response.choices[0].message.content
-                    
-                    # Add AI response to chat history
-                    st.session_state.chat_history.append({
-                        "role": "assistant",
-                        "content": ai_response
-                    })
-                    
-                    # Rerun to update the display
-                    st.rerun()
-                    
-                except Exception as e:
-                    st.error(f"❌ Error: {str(e)}")
-                    st.info("Make sure your OpenAI API key is correct and you have credits available")
+            ask_assistant(user_question, chat_container)
 
         # Suggested questions
         st.markdown("**💡 Suggested Questions:**")
-        col1, col2, col3 = st.columns(3)
+        suggestion_columns = st.columns(len(SUGGESTED_QUESTIONS))
         
-        with col1:
-            if st.button("📊 What are the key trends?"):
-                st.session_state.chat_history.append({
-                    "role": "user",
-                    "content": "What are the key trends in this sales data?"
-                })
-                st.rerun()
-        
-        with col2:
-            if st.button("🎯 How to improve?"):
-                st.session_state.chat_history.append({
-                    "role": "user",
-                    "content": "What specific actions can we take to improve our sales performance?"
-                })
-                st.rerun()
-        
-        with col3:
-            if st.button("⚠️ Any concerns?"):
-                st.session_state.chat_history.append({
-                    "role": "user",
-                    "content": "Are there any concerning patterns or red flags in this data?"
-                })
-                st.rerun()
+        for column, (label, question) in zip(suggestion_columns, SUGGESTED_QUESTIONS):
+            with column:
+                if st.button(label):
+                    answer_suggestion(question, chat_container)
+                if get_answer_prefetcher().ready(report_text, openai_api_key, question):
+                    st.caption("⚡ Answer ready")
+
+# Past reports, reloadable into the chatbot without calling n8n again
+with st.expander("🗂️ Report History"):
+    render_history()
+
+# AI Chatbot Section - Only show if report has been generated
+if current_report():
+    render_chatbot()
 
 # Footer with instructions
 st.divider()
@@ -509,6 +980,87 @@ with st.expander("🔧 Technical Details"):
     - Error handling and retry logic
     """)
 
+def session_memory():
+    # Bytes this session holds, vs. its own copy of the report text and plain-dict chat turns
+    chat = st.session_state.chat_history.memory()
+    report_text = current_report()
+    report_copy = sys.getsizeof(report_text) if report_text else 0
+    report_ref = sys.getsizeof(st.session_state.report_key) if st.session_state.report_key else 0
+    return {
+        "report_copy": report_copy,
+        "report_ref": report_ref,
+        "chat_plain": chat["plain_bytes"],
+        "chat": chat["bytes"],
+        "before": report_copy + chat["plain_bytes"],
+        "after": report_ref + chat["bytes"],
+        "messages": chat["messages"],
+        "compressed": chat["compressed"],
+        "dropped": chat["dropped"]
+    }
+
+
+@st.fragment(key="diagnostics")
+def render_diagnostics():
+    # Process-wide stage timings; refreshing only reruns this panel
+    snapshot = TELEMETRY.snapshot()
+    if not snapshot["stages"]:
+        st.caption("No timings recorded yet. Generate a report or ask a question first.")
+    else:
+        st.dataframe([
+            {
+                "Stage": stage,
+                "Count": summary["count"],
+                "p50 (ms)": round(summary["p50"] * 1000, 1),
+                "p95 (ms)": round(summary["p95"] * 1000, 1),
+                "p99 (ms)": round(summary["p99"] * 1000, 1),
+                "Max (ms)": round(summary["max"] * 1000, 1)
+            }
+            for stage, summary in snapshot["stages"].items()
+        ], hide_index=True)
+    
+    if snapshot["tokens"]:
+        st.markdown("**OpenAI tokens per call**")
+        st.dataframe([
+            {
+                "Kind": kind,
+                "Calls": summary["count"],
+                "Total": int(summary["sum"]),
+                "p50": summary["p50"],
+                "p95": summary["p95"],
+                "p99": summary["p99"]
+            }
+            for kind, summary in snapshot["tokens"].items()
+        ], hide_index=True)
+    
+    st.markdown("**Session memory**")
+    memory = session_memory()
+    st.dataframe([
+        {"Item": "Report", "Private copy (bytes)": memory["report_copy"], "Now (bytes)": memory["report_ref"]},
+        {"Item": "Chat history", "Private copy (bytes)": memory["chat_plain"], "Now (bytes)": memory["chat"]},
+        {"Item": "Total", "Private copy (bytes)": memory["before"], "Now (bytes)": memory["after"]}
+    ], hide_index=True)
+    store_stats = REPORT_STORE.stats()
+    st.caption(
+        f"💬 {memory['messages']} messages, {memory['compressed']} compressed, {memory['dropped']} dropped by the cap · "
+        f"🗃️ {store_stats['entries']} shared reports ({store_stats['bytes'] / 1024:.0f} KB for all sessions), "
+        f"{store_stats['reloads']} reloaded after eviction"
+    )
+    
+    col_a, col_b, col_c = st.columns(3)
+    with col_a:
+        if st.button("🔄 Refresh"):
+            rerun_fragment()
+    with col_b:
+        st.download_button("⬇️ Prometheus", TELEMETRY.to_prometheus(),
+                           file_name="sales_report_metrics.prom", mime="text/plain")
+    with col_c:
+        st.download_button("⬇️ JSONL", TELEMETRY.to_jsonl(),
+                           file_name="sales_report_metrics.jsonl", mime="application/x-ndjson")
+
+
+with st.expander("⏱️ Diagnostics: Stage Timings & Memory"):
+    render_diagnostics()
+
 with st.expander("🚀 Assignment Details"):
     st.markdown("""
     ### Assignment 9: Madison Tool Integration
@@ -547,4 +1099,4 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 # Footer
-st.caption("Powered by n8n Workflow Automation | Built with Streamlit | Enhanced with OpenAI")
\ No newline at end of file
+st.caption("Powered by n8n Workflow Automation | Built with Streamlit | Enhanced with OpenAI")
@@ -0,0 +1,118 @@
+"""Keeps chatbot prompts inside a token budget by folding older turns into a rolling summary."""
+import re
+from functools import lru_cache
+
+from chat_history import USER
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+DEFAULT_HISTORY_BUDGET = 1500
+DEFAULT_SUMMARY_BUDGET = 300
+SUMMARY_ANSWER_WORDS = 40
+
+SYSTEM_PROMPT = """You are a helpful sales data analyst assistant. You have access to this sales report data:
+
+{report}
+
+Answer questions about this data in a clear, concise, and actionable way. Provide specific numbers when relevant. Be friendly and professional."""
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    return tiktoken.encoding_for_model("gpt-4")
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text):
+    # Exact with tiktoken installed, otherwise the usual ~4 characters per token estimate
+    if tiktoken is not None:
+        return len(_encoding().encode(text))
+    return max(1, len(text) // 4)
+
+
+def message_tokens(message):
+    # Every chat message carries a few tokens of role/formatting overhead
+    return count_tokens(message.content) + 4
+
+
+def build_system_prompt(report_text):
+    # Identical for every question on the same report, so providers with
+    # prompt caching can reuse it as a prefix
+    return SYSTEM_PROMPT.format(report=report_text)
+
+
+def _shorten(text, words):
+    first_sentence = re.split(r"(?<=[.!?])\s", text.strip(), maxsplit=1)[0]
+    parts = first_sentence.split()
+    if len(parts) > words:
+        return " ".join(parts[:words]) + "..."
+    return first_sentence
+
+
+class ConversationContext:
+    """Per-session rolling summary plus the most recent turns that fit the budget."""
+
+    def __init__(self, history_budget=DEFAULT_HISTORY_BUDGET, summary_budget=DEFAULT_SUMMARY_BUDGET):
+        self.history_budget = history_budget
+        self.summary_budget = summary_budget
+        self.summary_lines = []
+        self.folded = 0
+
+    def reset(self):
+        self.summary_lines = []
+        self.folded = 0
+
+    def build_messages(self, report_text, history):
+        # self.folded counts from the first message ever added, so messages a capped
+        # ChatHistory trims off the front don't shift it
+        dropped = history.dropped
+        # History was cleared or replaced since we last folded it
+        if len(history) + dropped < self.folded:
+            self.reset()
+        folded = max(0, self.folded - dropped)
+
+        # Walk back from the newest turn until the budget is used up
+        start = len(history)
+        used = 0
+        while start > folded:
+            cost = message_tokens(history[start - 1])
+            if used + cost > self.history_budget and start < len(history):
+                break
+            used += cost
+            start -= 1
+
+        # Don't open the window on an orphaned answer
+        while start < len(history) - 1 and history[start].role != USER:
+            start += 1
+
+        if start > folded:
+            self._fold(history[folded:start])
+            folded = start
+        self.folded = folded + dropped
+
+        messages = [{"role": "system", "content": build_system_prompt(report_text)}]
+        if self.summary_lines:
+            messages.append({
+                "role": "system",
+                "content": "Summary of the earlier conversation:\n" + "\n".join(self.summary_lines)
+            })
+        for chat in history[folded:]:
+            messages.append({"role": chat.role, "content": chat.content})
+        return messages
+
+    def _fold(self, turns):
+        for chat in turns:
+            if chat.role == USER:
+                self.summary_lines.append(f"- Q: {_shorten(chat.content, SUMMARY_ANSWER_WORDS)}")
+            else:
+                self.summary_lines.append(f"  A: {_shorten(chat.content, SUMMARY_ANSWER_WORDS)}")
+
+        # Oldest summary lines go first once the summary outgrows its own budget
+        while len(self.summary_lines) > 1 and \
+                count_tokens("\n".join(self.summary_lines)) > self.summary_budget:
+            self.summary_lines.pop(0)
+            while len(self.summary_lines) > 1 and self.summary_lines[0].startswith("  A:"):
+                self.summary_lines.pop(0)
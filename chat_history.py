@@ -0,0 +1,133 @@
+"""Compact per-session chat history: slotted turns, compressed older text and a length cap."""
+import sys
+import zlib
+
+USER = "user"
+ASSISTANT = "assistant"
+
+DEFAULT_MAX_MESSAGES = 200
+# The newest messages stay plain text; they're the ones re-sent to the model every turn
+DEFAULT_PLAIN_MESSAGES = 8
+# Shorter texts don't shrink under zlib
+MIN_COMPRESS_BYTES = 256
+
+# How an assistant answer was produced (None: a fresh model call)
+LOCAL = "local"
+CACHED = "cached"
+PREFETCHED = "prefetched"
+
+
+class ChatTurn:
+    """One chat message. ``detail`` is the intent for local answers and
+    the match similarity for cached ones."""
+
+    __slots__ = ("role", "_text", "source", "ttft", "total_time", "detail")
+
+    def __init__(self, role, content, source=None, ttft=None, total_time=None, detail=None):
+        self.role = role
+        self._text = content
+        self.source = source
+        self.ttft = ttft
+        self.total_time = total_time
+        self.detail = detail
+
+    @property
+    def content(self):
+        if isinstance(self._text, bytes):
+            return zlib.decompress(self._text).decode("utf-8")
+        return self._text
+
+    @property
+    def compressed(self):
+        return isinstance(self._text, bytes)
+
+    def compress(self):
+        if self.compressed:
+            return
+        raw = self._text.encode("utf-8")
+        if len(raw) >= MIN_COMPRESS_BYTES:
+            blob = zlib.compress(raw)
+            if len(blob) < len(raw):
+                self._text = blob
+
+    def nbytes(self):
+        return sys.getsizeof(self) + sys.getsizeof(self._text) + _nbytes(self.detail) + \
+            sum(sys.getsizeof(value) for value in (self.ttft, self.total_time) if value is not None)
+
+    def as_dict(self):
+        # The plain-dict shape chat turns used to be stored in
+        turn = {"role": self.role, "content": self.content}
+        if self.source == LOCAL:
+            turn.update(route=LOCAL, intent=self.detail, total_time=self.total_time)
+        elif self.source == CACHED:
+            turn.update(similarity=self.detail)
+        elif self.source == PREFETCHED:
+            turn.update(prefetched=True, generation_time=self.total_time)
+        elif self.role == ASSISTANT:
+            turn.update(ttft=self.ttft, total_time=self.total_time)
+        return turn
+
+
+def _nbytes(value):
+    if value is None:
+        return 0
+    if isinstance(value, tuple):
+        return sys.getsizeof(value) + sum(_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+def _dict_nbytes(turn):
+    # Keys are interned literals shared by every dict, so only the values count
+    return sys.getsizeof(turn) + sum(sys.getsizeof(value) for value in turn.values()
+                                     if value is not None and not isinstance(value, bool))
+
+
+class ChatHistory:
+    """Capped list of ChatTurns; ``dropped`` counts messages trimmed off the front."""
+
+    def __init__(self, max_messages=DEFAULT_MAX_MESSAGES, plain_messages=DEFAULT_PLAIN_MESSAGES):
+        self.max_messages = max_messages
+        self.plain_messages = plain_messages
+        self._turns = []
+        self.dropped = 0
+
+    def add(self, role, content, **details):
+        turn = ChatTurn(role, content, **details)
+        self._turns.append(turn)
+        # The message that just left the plain window is compressed once
+        if len(self._turns) > self.plain_messages:
+            self._turns[-self.plain_messages - 1].compress()
+        overflow = len(self._turns) - self.max_messages
+        if overflow > 0:
+            # Trim whole exchanges, so the history never opens on an answer
+            while overflow < len(self._turns) and self._turns[overflow].role != USER:
+                overflow += 1
+            del self._turns[:overflow]
+            self.dropped += overflow
+        return turn
+
+    def pop(self):
+        return self._turns.pop()
+
+    def clear(self):
+        self._turns = []
+        self.dropped = 0
+
+    def __len__(self):
+        return len(self._turns)
+
+    def __iter__(self):
+        return iter(self._turns)
+
+    def __getitem__(self, index):
+        return self._turns[index]
+
+    def memory(self):
+        # Bytes held now vs as the plain dicts these turns used to be
+        return {
+            "messages": len(self._turns),
+            "compressed": sum(turn.compressed for turn in self._turns),
+            "dropped": self.dropped,
+            "bytes": sys.getsizeof(self._turns) + sum(turn.nbytes() for turn in self._turns),
+            "plain_bytes": sys.getsizeof(self._turns) + sum(_dict_nbytes(turn.as_dict()) for turn in self._turns)
+        }
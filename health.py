@@ -0,0 +1,133 @@
+"""Background n8n health probe and a circuit breaker around the report webhook."""
+import threading
+import time
+
+import requests
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30
+DEFAULT_PROBE_INTERVAL = 15
+DEFAULT_PROBE_TIMEOUT = 2
+
+# Outcome statuses that say n8n (or the workflow) is unhealthy, as opposed to
+# a configuration problem like a missing webhook
+FAILURE_STATUSES = ("timeout", "connection_error", "server_error")
+
+
+class CircuitBreaker:
+    """Opens after repeated failures, then lets a single trial request through after a cool-down."""
+
+    def __init__(self, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        # Call right before touching the network; may hand out the half-open trial
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN and time.time() - self._opened_at >= self.reset_timeout:
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            if self._state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def rejecting(self):
+        # Read-only check for the UI: True while requests would be turned away
+        with self._lock:
+            if self._state == OPEN:
+                return time.time() - self._opened_at < self.reset_timeout
+            return self._state == HALF_OPEN and self._trial_in_flight
+
+    def record_success(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._open()
+
+    def record_outcome(self, outcome):
+        if outcome["status"] in FAILURE_STATUSES:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def trip(self):
+        # Used by the health probe; keeps the breaker open for as long as n8n stays down
+        with self._lock:
+            self._open()
+
+    def snapshot(self):
+        with self._lock:
+            retry_in = None
+            if self._state == OPEN:
+                retry_in = max(0.0, self.reset_timeout - (time.time() - self._opened_at))
+            return {"state": self._state, "failures": self._failures, "retry_in": retry_in}
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.time()
+        self._trial_in_flight = False
+
+
+class HealthProbe:
+    """Polls the n8n base URL on a daemon thread and trips the breaker when it stops answering."""
+
+    def __init__(self, url, breaker=None, interval=DEFAULT_PROBE_INTERVAL, timeout=DEFAULT_PROBE_TIMEOUT):
+        self.url = url
+        self.breaker = breaker
+        self.interval = interval
+        self.timeout = timeout
+        self.healthy = None
+        self.latency = None
+        self.last_checked = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._loop, name="n8n-health-probe", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self):
+        started = time.perf_counter()
+        try:
+            # Any HTTP answer means n8n is up; only connection problems count as down
+            requests.get(self.url, timeout=self.timeout)
+        except requests.exceptions.RequestException as e:
+            self.healthy = False
+            self.error = type(e).__name__
+            if self.breaker:
+                self.breaker.trip()
+        else:
+            self.healthy = True
+            self.error = None
+        self.latency = time.perf_counter() - started
+        self.last_checked = time.time()
+        return self.healthy
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.check()
+            self._stop.wait(self.interval)
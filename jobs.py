@@ -0,0 +1,102 @@
+"""Background job pool so slow workflow calls don't block the Streamlit script thread."""
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_RETENTION_SECONDS = 60 * 60
+
+
+@dataclass
+class Job:
+    id: str
+    state: str = QUEUED
+    submitted_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    result: object = None
+    error: str = None
+
+    @property
+    def finished(self):
+        return self.state in (DONE, FAILED)
+
+    @property
+    def elapsed(self):
+        return (self.finished_at or time.time()) - self.submitted_at
+
+
+class JobManager:
+    """Runs submitted callables on a worker pool and tracks their state by job id.
+
+    Jobs submitted with a ``key`` while another job with that key is queued or
+    running get the existing job's id instead of a worker of their own.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, retention_seconds=DEFAULT_RETENTION_SECONDS):
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="report-job")
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+        self.joined = 0
+
+    def submit(self, fn, *args, key=None, **kwargs):
+        with self._lock:
+            job_id = self._active.get(key) if key is not None else None
+            if job_id is not None:
+                self.joined += 1
+                return job_id
+            self._prune()
+            job = Job(id=uuid.uuid4().hex)
+            self._jobs[job.id] = job
+            if key is not None:
+                self._active[key] = job.id
+        self._executor.submit(self._run, job.id, key, fn, args, kwargs)
+        return job.id
+
+    def get(self, job_id):
+        # Hand out a copy so callers never see a job change underneath them
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return replace(job) if job else None
+
+    def stats(self):
+        with self._lock:
+            counts = {QUEUED: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+            for job in self._jobs.values():
+                counts[job.state] += 1
+            return counts
+
+    def _run(self, job_id, key, fn, args, kwargs):
+        self._update(job_id, state=RUNNING, started_at=time.time())
+        try:
+            result = fn(*args, **kwargs)
+        except Exception as e:
+            self._update(job_id, key, state=FAILED, error=str(e), finished_at=time.time())
+        else:
+            self._update(job_id, key, state=DONE, result=result, finished_at=time.time())
+
+    def _update(self, job_id, key=None, **changes):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job:
+                for name, value in changes.items():
+                    setattr(job, name, value)
+            # A finished job takes no more joiners; the next submit for its key starts afresh
+            if key is not None and self._active.get(key) == job_id:
+                del self._active[key]
+
+    def _prune(self):
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items()
+                   if job.finished and job.finished_at < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
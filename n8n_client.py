@@ -0,0 +1,172 @@
+"""Talks to the n8n sales report workflow (payload, webhook call, response parsing)."""
+import json
+import os
+
+import requests
+
+from telemetry import TELEMETRY
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Overridable so the app can be pointed at another n8n instance or benchmarks/mock_servers.py
+N8N_BASE_URL = os.environ.get("N8N_BASE_URL", "http://localhost:5678").rstrip("/")
+WEBHOOK_URL = f"{N8N_BASE_URL}/webhook/madison-sales-webhook"
+HEALTH_URL = f"{N8N_BASE_URL}/healthz"
+DEFAULT_TIMEOUT = 60
+# Fail fast when n8n isn't listening instead of waiting out the read timeout
+CONNECT_TIMEOUT = 5
+# Background jobs aren't tied to a browser request, so they can wait much longer
+BACKGROUND_TIMEOUT = 300
+# Bodies are streamed and cut off here, so a runaway workflow can't fill memory
+MAX_RESPONSE_BYTES = int(os.environ.get("N8N_MAX_RESPONSE_BYTES", 5 * 1024 * 1024))
+# Error bodies are only shown as a preview
+MAX_ERROR_BYTES = 64 * 1024
+READ_CHUNK_BYTES = 64 * 1024
+
+
+def decode_json(body):
+    # orjson is several times faster on large workflow outputs when it's installed
+    if orjson is not None:
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as e:
+            raise ValueError(str(e)) from e
+    return json.loads(body)
+
+
+def format_json(value):
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode("utf-8")
+        except TypeError:
+            pass
+    return json.dumps(value, indent=2, default=str)
+
+
+def read_capped(response, max_bytes):
+    # (body, truncated) reading at most max_bytes of a streamed response
+    chunks, size = [], 0
+    for chunk in response.iter_content(chunk_size=READ_CHUNK_BYTES):
+        if size + len(chunk) > max_bytes:
+            chunks.append(chunk[:max_bytes - size])
+            return b"".join(chunks), True
+        chunks.append(chunk)
+        size += len(chunk)
+    return b"".join(chunks), False
+
+
+def build_payload(start_date, end_date, min_deal_value, deal_status, slack_channel):
+    # Same shape the n8n webhook node expects
+    return {
+        "start_date": start_date.strftime("%Y-%m-%d"),
+        "end_date": end_date.strftime("%Y-%m-%d"),
+        "min_deal_value": min_deal_value,
+        "deal_status": deal_status,
+        "slack_channel": slack_channel
+    }
+
+
+def extract_slack_message(result, default_channel):
+    # Handle the Slack API response structure returned by the workflow
+    slack_message_text = None
+    channel_info = default_channel
+
+    if 'message' in result and isinstance(result['message'], dict):
+        if 'text' in result['message']:
+            slack_message_text = result['message']['text']
+
+        # Get channel info
+        if 'channel' in result:
+            channel_info = result['channel']
+
+    return slack_message_text, channel_info
+
+
+def new_outcome(payload, status="error"):
+    return {
+        "status": status,
+        "status_code": None,
+        "result": None,
+        "error_detail": None,
+        "text": None,
+        "slack_message_text": None,
+        "channel": payload.get("slack_channel"),
+        "error": None,
+        "response_bytes": 0,
+        "truncated": False
+    }
+
+
+def generate_report(payload, timeout=DEFAULT_TIMEOUT, session=None, max_bytes=MAX_RESPONSE_BYTES):
+    # Call the webhook and turn whatever happens into a plain outcome dict,
+    # so callers can render it (or cache it) without holding on to the response.
+    # Pass a pooled session (see transport.py) to reuse keep-alive connections.
+    http = session or requests
+    outcome = new_outcome(payload)
+
+    try:
+        # n8n runs Airtable and Slack inside this call, so they show up in this stage
+        with TELEMETRY.span("webhook_round_trip"):
+            response = http.post(WEBHOOK_URL, json=payload, timeout=(CONNECT_TIMEOUT, timeout), stream=True)
+        with response:
+            status_code = response.status_code
+            limit = max_bytes if status_code == 200 else min(max_bytes, MAX_ERROR_BYTES)
+            with TELEMETRY.span("response_read"):
+                body, truncated = read_capped(response, limit)
+            encoding = response.encoding or "utf-8"
+    except requests.exceptions.Timeout:
+        outcome["status"] = "timeout"
+        return outcome
+    except requests.exceptions.ConnectionError:
+        outcome["status"] = "connection_error"
+        return outcome
+    except Exception as e:
+        outcome["error"] = str(e)
+        return outcome
+
+    outcome["status_code"] = status_code
+    outcome["response_bytes"] = len(body)
+    outcome["truncated"] = truncated
+
+    if status_code == 200 and truncated:
+        # Cut-off JSON can't be parsed, and half a report is worse than none
+        outcome["status"] = "response_too_large"
+        outcome["error"] = f"The workflow response is larger than the {max_bytes:,}-byte limit"
+
+    elif status_code == 200:
+        with TELEMETRY.span("response_decode"):
+            try:
+                result = decode_json(body)
+            except ValueError:
+                result = {"success": True, "message": "Workflow executed successfully"}
+            if not isinstance(result, dict):
+                result = {"success": True, "message": "Workflow executed successfully", "body": result}
+
+            slack_message_text, channel_info = extract_slack_message(result, payload.get("slack_channel"))
+        outcome.update({
+            "status": "success",
+            "result": result,
+            "slack_message_text": slack_message_text,
+            "channel": channel_info
+        })
+
+    elif status_code == 500:
+        outcome["status"] = "server_error"
+        try:
+            outcome["error_detail"] = None if truncated else decode_json(body)
+        except ValueError:
+            pass
+        if outcome["error_detail"] is None:
+            outcome["text"] = body.decode(encoding, errors="replace")
+
+    elif status_code == 404:
+        outcome["status"] = "not_found"
+
+    else:
+        outcome["status"] = "unexpected_status"
+        outcome["text"] = body.decode(encoding, errors="replace")
+
+    return outcome
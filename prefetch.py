@@ -0,0 +1,75 @@
+"""Answers the suggested chatbot questions in the background as soon as a report lands."""
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from assistant import AnswerStats, complete_answer
+from chat_context import build_system_prompt
+from report_parser import report_hash
+
+# (button label, question sent to the model)
+SUGGESTED_QUESTIONS = [
+    ("📊 What are the key trends?", "What are the key trends in this sales data?"),
+    ("🎯 How to improve?", "What specific actions can we take to improve our sales performance?"),
+    ("⚠️ Any concerns?", "Are there any concerning patterns or red flags in this data?")
+]
+
+DEFAULT_MAX_WORKERS = 3
+DEFAULT_MAX_REPORTS = 32
+
+
+def _entry_key(report_text, api_key):
+    # The key itself is never stored, only its hash
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest(), report_hash(report_text)
+
+
+class AnswerPrefetcher:
+    """Process-wide cache of prefetched answers keyed by (API key hash, report hash, question).
+
+    Answers are only handed back to sessions using the API key that paid for them.
+    """
+
+    def __init__(self, max_workers=DEFAULT_MAX_WORKERS, max_reports=DEFAULT_MAX_REPORTS):
+        self.max_reports = max_reports
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="answer-prefetch")
+        self._answers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def prefetch(self, report_text, api_key, client, questions=None):
+        # Cheap to call on every rerun: questions already fetched (or failed) are left alone
+        questions = questions or [question for _, question in SUGGESTED_QUESTIONS]
+        key = _entry_key(report_text, api_key)
+        with self._lock:
+            entry = self._answers.setdefault(key, {})
+            self._answers.move_to_end(key)
+            for question in questions:
+                if question not in entry:
+                    entry[question] = self._executor.submit(self._answer, client, report_text, question)
+            while len(self._answers) > self.max_reports:
+                self._answers.popitem(last=False)
+
+    def get(self, report_text, api_key, question, timeout=None):
+        # (answer, seconds it took to generate) or None if it wasn't prefetched or failed
+        with self._lock:
+            future = self._answers.get(_entry_key(report_text, api_key), {}).get(question)
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=timeout)
+        except Exception:
+            return None
+
+    def ready(self, report_text, api_key, question):
+        with self._lock:
+            future = self._answers.get(_entry_key(report_text, api_key), {}).get(question)
+        return future is not None and future.done() and future.exception() is None
+
+    def _answer(self, client, report_text, question):
+        stats = AnswerStats()
+        messages = [
+            {"role": "system", "content": build_system_prompt(report_text)},
+            {"role": "user", "content": question}
+        ]
+        answer = complete_answer(client, messages, stats)
+        return answer, stats.total_time
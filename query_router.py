@@ -0,0 +1,221 @@
+"""Answers plain numeric questions from the parsed report before anything goes to the model.
+
+"What was revenue?", "how many deals did we close?" and "what's the WoW change?"
+are lookups against numbers already in the Slack message, so they get a
+templated answer in milliseconds. Only questions matching one of the known
+shapes in full are answered here; anything open-ended or qualified, or any
+question whose metric the report doesn't contain, is routed to the model.
+"""
+import logging
+import re
+import threading
+import time
+from dataclasses import dataclass
+
+from report_parser import parse_report
+
+logger = logging.getLogger(__name__)
+
+LOCAL = "local"
+MODEL = "model"
+
+# Questions longer than this are rarely a single lookup
+MAX_LOCAL_WORDS = 16
+# Assumed model latency until real answers have been timed
+DEFAULT_MODEL_SECONDS = 5.0
+MODEL_LATENCY_WINDOW = 50
+
+# Anything asking for reasoning, advice or interpretation needs the model
+_OPEN_ENDED = re.compile(
+    r"\b(why|how (can|could|should|do|to)|should|improve|recommend|suggest|advice|explain|"
+    r"concern|worr|risk|trend|pattern|strateg|compare|insight|what if|predict|forecast|because)",
+    re.IGNORECASE
+)
+
+# Each intent is a whitelist of whole-question shapes (after normalize_question).
+# Anything outside them - another deal status ("lost", "open"), a segment ("from
+# enterprise customers", "per rep"), another time range ("last year", "on Monday")
+# or a target - goes to the model rather than getting this period's number.
+_LEAD = r"(?:(?:what|how much) (?:is|was|are|were) |(?:tell me|show me|give me) )?"
+_DET = r"(?:(?:the|our|my|total|overall) )*"
+_PERIOD = r"(?: (?:in|for|during|over) (?:this|the) (?:week|period|report)| this (?:week|period))?"
+_REVENUE = r"(?:closed )?(?:revenue|sales)"
+_DIRECTION = r"(?:up|down|increase|decrease|grow|drop|fall)"
+
+_INTENTS = [
+    ("avg_deal_size", [
+        _LEAD + _DET + r"(?:average|avg|mean|typical) (?:deal|deal size|deal value|deal amount)" + _PERIOD,
+        _LEAD + _DET + r"deal size" + _PERIOD
+    ]),
+    ("win_rate", [
+        _LEAD + _DET + r"(?:win|close) rate" + _PERIOD
+    ]),
+    ("wow_change", [
+        _LEAD + _DET + r"(?:wow|week over week|period over period)(?: (?:change|growth))?(?: in " + _REVENUE + r")?",
+        _LEAD + _DET + _REVENUE + r" (?:change|growth)" + _PERIOD,
+        r"how much (?:did|has) " + _DET + _REVENUE + r" (?:change|changed|grow|grown)" + _PERIOD,
+        r"(?:did|has) " + _DET + _REVENUE + r" (?:go |gone )?" + _DIRECTION + r"(?:d|ed)?" + _PERIOD,
+        r"(?:is|are) " + _DET + _REVENUE + r" (?:up|down)(?: or (?:up|down))?" + _PERIOD
+    ]),
+    ("prev_revenue", [
+        _LEAD + _DET + r"(?:previous|prior|prev) period (?:revenue|sales)",
+        _LEAD + _DET + r"(?:revenue|sales) (?:in|for|during) the (?:previous|prior) period"
+    ]),
+    ("deals", [
+        r"how many " + _DET + r"(?:closed |won )?deals?(?: (?:did|have) we (?:close|closed|win|won))?" + _PERIOD,
+        r"how many " + _DET + r"deals? (?:were|have been) (?:closed|won)" + _PERIOD,
+        _LEAD + _DET + r"(?:number|count) of (?:closed |won )?deals" + _PERIOD,
+        _LEAD + _DET + r"(?:closed |won )?deal count" + _PERIOD
+    ]),
+    ("revenue", [
+        _LEAD + _DET + _REVENUE + _PERIOD,
+        r"how much (?:revenue |sales )?did we (?:make|earn|close|bring in)" + _PERIOD
+    ])
+]
+_INTENTS = [(intent, [re.compile(shape) for shape in shapes]) for intent, shapes in _INTENTS]
+
+
+def normalize_question(question):
+    # "What's the week-over-week change?" -> "what is the week over week change"
+    text = question.lower().replace("’", "'").replace("what's", "what is").replace("-", " ")
+    text = re.sub(r"[^a-z0-9%' ]+", " ", text).replace("'", "")
+    return " ".join(text.split())
+
+
+def _money(value):
+    return f"${value:,.0f}"
+
+
+def _answer_deals(metrics):
+    if "Won Deals:" not in metrics.labels and "Closed Deals:" not in metrics.labels:
+        return None
+    noun = "deal" if metrics.deals == 1 else "deals"
+    return f"The report shows **{metrics.deals:,} {noun}** closed in this period."
+
+
+def _answer_revenue(metrics):
+    if "Closed Revenue:" not in metrics.labels and "Latest:" not in metrics.labels:
+        return None
+    return f"Closed revenue for this period is **{_money(metrics.revenue)}**."
+
+
+def _answer_prev_revenue(metrics):
+    if metrics.prev_revenue is None:
+        return None
+    return (f"Revenue in the previous period was **{_money(metrics.prev_revenue)}**, "
+            f"against {_money(metrics.revenue)} in this one.")
+
+
+def _answer_wow_change(metrics):
+    if "WoW:" not in metrics.labels:
+        return None
+    if not metrics.prev_revenue:
+        return "There is no previous-period revenue in the report to compare against."
+    direction = "down" if metrics.wow_change.startswith("-") else "up"
+    return (f"Revenue is **{direction} {metrics.wow_change.lstrip('+-')}** on the previous period "
+            f"({_money(metrics.prev_revenue)} → {_money(metrics.revenue)}).")
+
+
+def _answer_avg_deal_size(metrics):
+    if metrics.avg_deal_size is not None:
+        return f"The average deal size is **{_money(metrics.avg_deal_size)}**."
+    # Older n8n messages don't carry the label, but it follows from the totals
+    if metrics.deals and "Closed Revenue:" in metrics.labels:
+        return (f"The average deal size is about **{_money(metrics.revenue / metrics.deals)}** "
+                f"({_money(metrics.revenue)} across {metrics.deals:,} deals).")
+    return None
+
+
+def _answer_win_rate(metrics):
+    if metrics.win_rate is None:
+        return None
+    return f"The win rate for this period is **{metrics.win_rate}**."
+
+
+_ANSWERS = {
+    "deals": _answer_deals,
+    "revenue": _answer_revenue,
+    "prev_revenue": _answer_prev_revenue,
+    "wow_change": _answer_wow_change,
+    "avg_deal_size": _answer_avg_deal_size,
+    "win_rate": _answer_win_rate
+}
+
+
+def classify(question):
+    # The intent name, or None if the question isn't a plain metric lookup
+    if len(question.split()) > MAX_LOCAL_WORDS or _OPEN_ENDED.search(question):
+        return None
+    normalized = normalize_question(question)
+    for intent, shapes in _INTENTS:
+        if any(shape.fullmatch(normalized) for shape in shapes):
+            return intent
+    return None
+
+
+@dataclass
+class RouteDecision:
+    path: str
+    intent: str = None
+    answer: str = None
+    elapsed: float = 0.0
+
+
+class QueryRouter:
+    """Routes chatbot questions to a local template answer or to the model, and keeps score."""
+
+    def __init__(self, default_model_seconds=DEFAULT_MODEL_SECONDS):
+        self.default_model_seconds = default_model_seconds
+        self._model_latencies = []
+        self._lock = threading.Lock()
+        self.local_answers = 0
+        self.model_answers = 0
+        self.seconds_saved = 0.0
+
+    def route(self, report_text, question):
+        started = time.perf_counter()
+        intent = classify(question)
+        answer = None
+        if intent is not None:
+            answer = _ANSWERS[intent](parse_report(report_text))
+        elapsed = time.perf_counter() - started
+
+        if answer is None:
+            with self._lock:
+                self.model_answers += 1
+            logger.info("route=model intent=%s routing_ms=%.2f question=%r", intent, elapsed * 1000, question)
+            return RouteDecision(MODEL, intent, elapsed=elapsed)
+
+        saved = max(self.model_latency() - elapsed, 0.0)
+        with self._lock:
+            self.local_answers += 1
+            self.seconds_saved += saved
+        logger.info("route=local intent=%s answer_ms=%.2f saved_s=%.2f question=%r",
+                    intent, elapsed * 1000, saved, question)
+        return RouteDecision(LOCAL, intent, answer, elapsed)
+
+    def record_model_latency(self, seconds):
+        if seconds is None:
+            return
+        with self._lock:
+            self._model_latencies.append(seconds)
+            del self._model_latencies[:-MODEL_LATENCY_WINDOW]
+
+    def model_latency(self):
+        # Mean of the recent model answers, the estimate for what a local answer saved
+        with self._lock:
+            if not self._model_latencies:
+                return self.default_model_seconds
+            return sum(self._model_latencies) / len(self._model_latencies)
+
+    def stats(self):
+        model_latency = self.model_latency()
+        with self._lock:
+            routed = self.local_answers + self.model_answers
+            return {
+                "local": self.local_answers,
+                "model": self.model_answers,
+                "local_rate": self.local_answers / routed if routed else 0.0,
+                "seconds_saved": self.seconds_saved,
+                "model_latency": model_latency
+            }
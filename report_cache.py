@@ -0,0 +1,134 @@
+"""Content-addressed cache for generated sales reports, shared across sessions."""
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date, datetime
+
+DEFAULT_TTL_SECONDS = 60 * 60
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 20 * 1024 * 1024
+
+
+def _normalize_day(value):
+    # Presets build end_date from datetime.now(), so only the day is meaningful
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    text = str(value).strip()
+    try:
+        return datetime.fromisoformat(text).date().isoformat()
+    except ValueError:
+        return text
+
+
+def _normalize_channel(channel):
+    channel = (channel or "").strip().lower()
+    if channel and not channel.startswith("#"):
+        channel = "#" + channel
+    return channel
+
+
+def normalize_payload(payload):
+    min_value = float(payload.get("min_deal_value") or 0)
+    return {
+        "start_date": _normalize_day(payload.get("start_date")),
+        "end_date": _normalize_day(payload.get("end_date")),
+        "min_deal_value": int(min_value) if min_value.is_integer() else min_value,
+        "deal_status": sorted({s.strip().title() for s in payload.get("deal_status") or []}),
+        "slack_channel": _normalize_channel(payload.get("slack_channel"))
+    }
+
+
+def payload_key(payload):
+    canonical = json.dumps(normalize_payload(payload), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CacheEntry:
+    value: dict
+    created_at: float
+    size: int
+    # Overrides the cache-wide TTL, e.g. for prewarmed reports kept until their next refresh
+    ttl_seconds: float = None
+
+    @property
+    def age(self):
+        return time.time() - self.created_at
+
+
+class ReportCache:
+    """Thread-safe TTL cache with LRU eviction by entry count and approximate size."""
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.age > (entry.ttl_seconds or self.ttl_seconds):
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, value, ttl_seconds=None, created_at=None):
+        size = len(json.dumps(value, default=str))
+        if size > self.max_bytes:
+            return None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = CacheEntry(value=value, created_at=created_at or time.time(), size=size, ttl_seconds=ttl_seconds)
+            self._entries[key] = entry
+            self._bytes += size
+
+            # Evict least recently used entries until we fit again
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+            return entry
+
+    def invalidate(self, key=None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+            elif key in self._entries:
+                self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
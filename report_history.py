@@ -0,0 +1,189 @@
+"""Persistent history of generated reports in SQLite, with compressed bodies.
+
+Listing and paging only touch the small ``reports`` table (payload fields,
+headline numbers, generation time); the zlib-compressed report text and full
+API response live in ``report_bodies`` and are read one report at a time.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+from report_cache import normalize_payload, payload_key
+from report_parser import parse_report, report_hash
+
+# Next to the app, so the history doesn't depend on the directory streamlit was started from
+DEFAULT_PATH = os.environ.get("REPORT_HISTORY_PATH",
+                              os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_history.sqlite3"))
+DEFAULT_PAGE_SIZE = 10
+COMPRESSION_LEVEL = 6
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at REAL NOT NULL,
+    payload_key TEXT NOT NULL,
+    start_date TEXT,
+    end_date TEXT,
+    min_deal_value REAL,
+    deal_status TEXT,
+    slack_channel TEXT,
+    source TEXT NOT NULL,
+    report_hash TEXT NOT NULL,
+    deals INTEGER,
+    revenue REAL,
+    wow_change TEXT,
+    text_bytes INTEGER,
+    stored_bytes INTEGER
+);
+CREATE TABLE IF NOT EXISTS report_bodies (
+    report_id INTEGER PRIMARY KEY REFERENCES reports(id) ON DELETE CASCADE,
+    text BLOB NOT NULL,
+    response BLOB
+);
+CREATE INDEX IF NOT EXISTS reports_created_at ON reports (created_at);
+CREATE INDEX IF NOT EXISTS reports_payload ON reports (payload_key, created_at);
+CREATE INDEX IF NOT EXISTS reports_range ON reports (start_date, end_date);
+CREATE INDEX IF NOT EXISTS reports_channel ON reports (slack_channel, id);
+CREATE INDEX IF NOT EXISTS reports_hash ON reports (report_hash);
+"""
+
+_SUMMARY_COLUMNS = ("id, created_at, payload_key, start_date, end_date, min_deal_value, deal_status, "
+                    "slack_channel, source, report_hash, deals, revenue, wow_change, text_bytes, stored_bytes")
+
+
+def _compress(text):
+    return zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+
+
+def _decompress(blob):
+    return zlib.decompress(blob).decode("utf-8") if blob is not None else None
+
+
+@dataclass(frozen=True)
+class HistoryEntry:
+    """One stored report without its body."""
+    id: int
+    created_at: float
+    payload_key: str
+    start_date: str
+    end_date: str
+    min_deal_value: float
+    deal_status: tuple
+    slack_channel: str
+    source: str
+    report_hash: str
+    deals: int
+    revenue: float
+    wow_change: str
+    text_bytes: int
+    stored_bytes: int
+
+    @classmethod
+    def from_row(cls, row):
+        values = list(row)
+        values[6] = tuple(json.loads(values[6] or "[]"))
+        return cls(*values)
+
+
+class ReportHistory:
+    """Thread-safe SQLite report store; one connection shared behind a lock."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        if path != ":memory:":
+            # Readers don't block the writer (background jobs save while sessions page)
+            self._conn.execute("PRAGMA journal_mode = WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def save(self, payload, report_text, response=None, source="workflow"):
+        normalized = normalize_payload(payload)
+        metrics = parse_report(report_text)
+        text_blob = _compress(report_text)
+        response_blob = _compress(json.dumps(response, default=str)) if response is not None else None
+        stored_bytes = len(text_blob) + len(response_blob or b"")
+
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO reports (created_at, payload_key, start_date, end_date, min_deal_value, "
+                "deal_status, slack_channel, source, report_hash, deals, revenue, wow_change, "
+                "text_bytes, stored_bytes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (time.time(), payload_key(payload), normalized["start_date"], normalized["end_date"],
+                 normalized["min_deal_value"], json.dumps(normalized["deal_status"]),
+                 normalized["slack_channel"], source, report_hash(report_text), metrics.deals,
+                 metrics.revenue, metrics.wow_change, len(report_text.encode("utf-8")), stored_bytes)
+            )
+            report_id = cursor.lastrowid
+            self._conn.execute(
+                "INSERT INTO report_bodies (report_id, text, response) VALUES (?, ?, ?)",
+                (report_id, text_blob, response_blob)
+            )
+        return report_id
+
+    def page(self, before_id=None, limit=DEFAULT_PAGE_SIZE, slack_channel=None):
+        # Newest first, keyset-paginated on the primary key so deep pages stay cheap
+        clauses, params = [], []
+        if before_id is not None:
+            clauses.append("id < ?")
+            params.append(before_id)
+        if slack_channel:
+            clauses.append("slack_channel = ?")
+            params.append(slack_channel)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM reports {where} ORDER BY id DESC LIMIT ?",
+                (*params, limit)
+            ).fetchall()
+        return [HistoryEntry.from_row(row) for row in rows]
+
+    def latest(self, payload_key, since=None):
+        # Newest report generated for this payload (after ``since``), or None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM reports WHERE payload_key = ? AND created_at >= ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (payload_key, since or 0)
+            ).fetchone()
+        return HistoryEntry.from_row(row) if row else None
+
+    def load(self, report_id):
+        # (report text, API response) or None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT text, response FROM report_bodies WHERE report_id = ?", (report_id,)
+            ).fetchone()
+        if row is None:
+            return None
+        response = _decompress(row[1])
+        return _decompress(row[0]), json.loads(response) if response is not None else None
+
+    def find_text(self, report_hash):
+        # Text of the newest stored report with this content hash, or None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.text FROM reports r JOIN report_bodies b ON b.report_id = r.id "
+                "WHERE r.report_hash = ? ORDER BY r.id DESC LIMIT 1", (report_hash,)
+            ).fetchone()
+        return _decompress(row[0]) if row else None
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+
+    def stats(self):
+        with self._lock:
+            count, text_bytes, stored_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(text_bytes), 0), COALESCE(SUM(stored_bytes), 0) FROM reports"
+            ).fetchone()
+        return {"reports": count, "text_bytes": text_bytes, "stored_bytes": stored_bytes}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
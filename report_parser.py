@@ -0,0 +1,153 @@
+"""Parser turning the Slack report text into a typed ReportMetrics, memoized by content hash.
+
+Each report is parsed once, however many reruns and UI sections read it.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from telemetry import TELEMETRY
+
+PARSE_CACHE_SIZE = 256
+
+# Every label the report uses, matched in one scan per line
+_LABELS = re.compile(
+    r"(Won Deals:|Closed Deals:|Latest:|Prev:|Closed Revenue:|WoW:|Average Deal Size:|Win Rate:"
+    r"|Summary:|Insight:|Recommendation:)"
+)
+# Amounts may carry thousands separators or decimals ("$12,450.50")
+_NUMBER = re.compile(r"\d[\d,]*(?:\.\d+)?")
+_PERCENT = re.compile(r"[-+]?\d+(?:\.\d+)?%")
+
+# Lines shown under "Key Insights"; a line carrying several labels is shown
+# once, under the first of these that it contains
+INSIGHT_KINDS = {
+    "Latest:": "latest",
+    "Summary:": "summary",
+    "Insight:": "insight",
+    "Recommendation:": "recommendation"
+}
+
+
+@dataclass(frozen=True)
+class ReportMetrics:
+    deals: int = 0
+    revenue: float = 0
+    latest_revenue: float = None
+    prev_revenue: float = None
+    wow_change: str = "0%"
+    avg_deal_size: float = None
+    win_rate: str = None
+    summary: str = None
+    insight: str = None
+    recommendation: str = None
+    insight_lines: tuple = ()
+    has_trend: bool = False
+    # Labels that actually appeared, to tell a real 0 from a missing value
+    labels: frozenset = frozenset()
+
+
+def report_hash(report_text):
+    return hashlib.sha256(report_text.encode("utf-8")).hexdigest()
+
+
+def _to_number(text):
+    value = float(text.replace(",", ""))
+    return int(value) if value.is_integer() else value
+
+
+def _first_number(text):
+    match = _NUMBER.search(text)
+    return _to_number(match.group()) if match else None
+
+
+def _segment_after(line, label):
+    # "Latest: $5,000 | Prev: $4,000" -> " $5,000 "
+    return line.split(label, 1)[1].split("|", 1)[0]
+
+
+def parse_report_uncached(report_text):
+    fields = {}
+    insight_lines = []
+    seen = set()
+    # Only used when the report has no "Latest:" figure, wherever the two lines appear
+    closed_revenue = None
+
+    for line in report_text.splitlines():
+        labels = _LABELS.findall(line)
+        if not labels:
+            continue
+        seen.update(labels)
+
+        for label in labels:
+            if label in ("Won Deals:", "Closed Deals:"):
+                number = _first_number(line)
+                if number is not None:
+                    fields["deals"] = int(number)
+            elif label == "Latest:":
+                number = _first_number(_segment_after(line, label))
+                if number is not None:
+                    fields["latest_revenue"] = fields["revenue"] = number
+            elif label == "Prev:":
+                number = _first_number(_segment_after(line, label))
+                if number is not None:
+                    fields["prev_revenue"] = number
+            elif label == "Closed Revenue:":
+                number = _first_number(_segment_after(line, label))
+                if number is not None:
+                    closed_revenue = number
+            elif label == "WoW:":
+                match = _PERCENT.search(line)
+                if match:
+                    fields["wow_change"] = match.group()
+            elif label == "Average Deal Size:":
+                number = _first_number(_segment_after(line, label))
+                if number is not None:
+                    fields["avg_deal_size"] = number
+            elif label == "Win Rate:":
+                match = _PERCENT.search(_segment_after(line, label))
+                if match:
+                    fields["win_rate"] = match.group()
+
+        for label, kind in INSIGHT_KINDS.items():
+            if label in labels:
+                text = line.strip()
+                insight_lines.append((kind, text))
+                value = line.split(label, 1)[1].strip()
+                if kind != "latest" and value and kind not in fields:
+                    fields[kind] = value
+                break
+
+    if "revenue" not in fields and closed_revenue is not None:
+        fields["revenue"] = closed_revenue
+
+    return ReportMetrics(
+        insight_lines=tuple(insight_lines),
+        has_trend="Latest:" in seen and "Prev:" in seen,
+        labels=frozenset(seen),
+        **fields
+    )
+
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def parse_report(report_text):
+    # Memoized by content hash, so every rerun and every UI section shares one parse
+    key = report_hash(report_text)
+    with _cache_lock:
+        metrics = _cache.get(key)
+        if metrics is not None:
+            _cache.move_to_end(key)
+            return metrics
+
+    with TELEMETRY.span("metrics_parse"):
+        metrics = parse_report_uncached(report_text)
+    with _cache_lock:
+        _cache[key] = metrics
+        while len(_cache) > PARSE_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return metrics
@@ -0,0 +1,84 @@
+"""Process-wide, content-addressed store of report texts.
+
+Sessions keep only a report's SHA-256 key in ``session_state``; the text
+lives here once per process no matter how many sessions are looking at it.
+Least recently used reports are evicted past the size limits and reloaded
+by key (from the report history) the next time a session asks for them.
+"""
+import sys
+import threading
+from collections import OrderedDict
+
+from report_parser import report_hash
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+
+
+class ReportStore:
+    """Thread-safe LRU of interned report texts keyed by content hash."""
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._reports = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.puts = 0
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+
+    def put(self, report_text):
+        key = report_hash(report_text)
+        with self._lock:
+            self.puts += 1
+            if key in self._reports:
+                # Already interned: the caller's copy can be garbage collected
+                self._reports.move_to_end(key)
+                return key
+            self._add(key, report_text)
+        return key
+
+    def get(self, key, reload=None):
+        # The report text, or None; ``reload(key)`` is tried after an eviction
+        with self._lock:
+            text = self._reports.get(key)
+            if text is not None:
+                self._reports.move_to_end(key)
+                self.hits += 1
+                return text
+            self.misses += 1
+        text = reload(key) if reload else None
+        if text is None or report_hash(text) != key:
+            return None
+        with self._lock:
+            self.reloads += 1
+            if key not in self._reports:
+                self._add(key, text)
+            return self._reports.get(key, text)
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._reports
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._reports),
+                "bytes": self._bytes,
+                "puts": self.puts,
+                "hits": self.hits,
+                "misses": self.misses,
+                "reloads": self.reloads
+            }
+
+    def _add(self, key, text):
+        self._reports[key] = text
+        self._bytes += sys.getsizeof(text)
+        while len(self._reports) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._reports.popitem(last=False)
+            self._bytes -= sys.getsizeof(evicted)
+
+
+REPORT_STORE = ReportStore()
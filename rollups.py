@@ -0,0 +1,226 @@
+"""Daily sales rollups with prefix sums, so any date range is answered without rescanning deals.
+
+Each day with deals keeps, per deal status and per minimum-deal-value
+bucket, the number of deals and their revenue. Running totals over days turn a range query into
+the difference of two rows, and bucket totals are stored "at or above this
+threshold", so the sidebar's minimum deal value is a single index lookup.
+"""
+import copy
+import threading
+
+import numpy as np
+
+from analytics import STATUSES, SalesMetrics, day_number
+
+# Minimum deal value thresholds answered exactly: every $1,000 up to $100k
+# (the sidebar steps by 1,000), then a few coarse ones for large deals
+DEFAULT_THRESHOLDS = tuple(range(0, 100_000, 1000)) + (100_000, 250_000, 500_000, 1_000_000)
+
+
+class DailyRollups:
+    """Per day x status x value-bucket counts and revenue, with cumulative sums over days.
+
+    Only days that have deals get a row, and only the thresholds up to the
+    largest deal (plus the first one above it) get a bucket, so an export with
+    one stray close date or a narrow range of deal values stays small. Larger
+    deals added later grow the thresholds in use.
+    """
+
+    def __init__(self, thresholds=DEFAULT_THRESHOLDS, statuses=STATUSES, max_amount=None):
+        self.all_thresholds = tuple(sorted(thresholds))
+        self.thresholds = np.asarray(_thresholds_in_use(self.all_thresholds, max_amount), dtype=np.float64)
+        self.statuses = tuple(statuses)
+        shape = (0, len(self.statuses), len(self.thresholds))
+        # Day numbers (see analytics.day_number) of the rows, ascending
+        self._day_list = np.zeros(0, dtype=np.int64)
+        self._counts = np.zeros(shape, dtype=np.int64)
+        self._revenue = np.zeros(shape, dtype=np.float64)
+        # Row r holds totals for rows [0, r); bucket b holds deals >= thresholds[b]
+        self._cum_counts = np.zeros((1,) + shape[1:], dtype=np.int64)
+        self._cum_revenue = np.zeros((1,) + shape[1:], dtype=np.float64)
+
+    @classmethod
+    def from_deal_set(cls, deal_set, thresholds=DEFAULT_THRESHOLDS):
+        max_amount = float(deal_set.amounts.max()) if len(deal_set) else None
+        rollups = cls(thresholds=thresholds, max_amount=max_amount)
+        rollups.add_deals(deal_set)
+        return rollups
+
+    @property
+    def days(self):
+        # Days with at least one deal, not the calendar span
+        return len(self._day_list)
+
+    @property
+    def first_day(self):
+        return int(self._day_list[0]) if self.days else None
+
+    @property
+    def last_day(self):
+        return int(self._day_list[-1]) if self.days else None
+
+    def supports(self, min_deal_value):
+        return min_deal_value <= self.all_thresholds[0] or min_deal_value in self.all_thresholds
+
+    def add_deals(self, deal_set):
+        # Usually new days at the end; late updates to older days only redo
+        # the running totals from the earliest row touched
+        if not len(deal_set):
+            return
+        status_index = np.array([self.statuses.index(s) if s in self.statuses else -1
+                                 for s in deal_set.statuses] + [-1])
+        statuses = status_index[deal_set.status_codes]
+        buckets = np.searchsorted(self.thresholds, deal_set.amounts, side="right") - 1
+        keep = (statuses >= 0) & (buckets >= 0)
+        if not keep.any():
+            return
+        amounts = deal_set.amounts[keep]
+        if amounts.max() >= self.thresholds[-1]:
+            self._extend_thresholds(float(amounts.max()))
+            buckets = np.searchsorted(self.thresholds, deal_set.amounts, side="right") - 1
+
+        days = deal_set.days[keep]
+        self._insert_days(np.setdiff1d(days, self._day_list))
+        rows = np.searchsorted(self._day_list, days)
+        low = int(rows.min())
+        high = int(rows.max()) + 1
+
+        n_status, n_bucket = len(self.statuses), len(self.thresholds)
+        flat = ((rows - low) * n_status + statuses[keep]) * n_bucket + buckets[keep]
+        size = (high - low) * n_status * n_bucket
+        shape = (high - low, n_status, n_bucket)
+        self._counts[low:high] += np.bincount(flat, minlength=size).reshape(shape)
+        self._revenue[low:high] += np.bincount(flat, weights=amounts, minlength=size).reshape(shape)
+
+        self._accumulate(low)
+
+    def copy(self):
+        return copy.deepcopy(self)
+
+    def window(self, start_date, end_date):
+        return self.window_days(day_number(start_date), day_number(end_date))
+
+    def metrics(self, start_date, end_date, min_deal_value=0, deal_status=("Won", "Closed")):
+        if not self.supports(min_deal_value):
+            raise ValueError(f"No rollup bucket for a minimum deal value of {min_deal_value}")
+        # Thresholds past the last one in use have no deals, just like the last one
+        bucket = min(int(np.searchsorted(self.thresholds, max(min_deal_value, self.thresholds[0]))),
+                     len(self.thresholds) - 1)
+        wanted = {s.strip().title() for s in deal_status}
+        selected = np.array([s in wanted for s in self.statuses])
+
+        start_day = day_number(start_date)
+        end_day = day_number(end_date)
+        span = end_day - start_day + 1
+        counts, revenue = self.window_days(start_day, end_day)
+        prev_counts, prev_revenue = self.window_days(start_day - span, start_day - 1)
+
+        deals = int(counts[selected, bucket].sum())
+        total = float(revenue[selected, bucket].sum())
+        prev_total = float(prev_revenue[selected, bucket].sum())
+        status_counts = {status: int(count) for status, count in zip(self.statuses, counts[:, bucket])}
+        won = status_counts.get("Won", 0) + status_counts.get("Closed", 0)
+        decided = won + status_counts.get("Lost", 0)
+
+        return SalesMetrics(
+            start_date=start_date,
+            end_date=end_date,
+            deals=deals,
+            revenue=total,
+            avg_deal_size=total / deals if deals else 0.0,
+            prev_deals=int(prev_counts[selected, bucket].sum()),
+            prev_revenue=prev_total,
+            wow_change=(total - prev_total) / prev_total * 100 if prev_total else None,
+            win_rate=won / decided * 100 if decided else None,
+            status_counts=status_counts
+        )
+
+    def window_days(self, start_day, end_day):
+        # (counts, revenue) per status x threshold for an inclusive day range, in O(log days)
+        low = int(np.searchsorted(self._day_list, start_day, side="left"))
+        high = int(np.searchsorted(self._day_list, end_day, side="right"))
+        if high <= low:
+            return np.zeros_like(self._cum_counts[0]), np.zeros_like(self._cum_revenue[0])
+        return (self._cum_counts[high] - self._cum_counts[low],
+                self._cum_revenue[high] - self._cum_revenue[low])
+
+    def _insert_days(self, new_days):
+        # Empty rows for days not seen before; running totals after them are redone by the caller
+        if not len(new_days):
+            return
+        day_list = np.union1d(self._day_list, new_days)
+        old_rows = np.searchsorted(day_list, self._day_list)
+        first_new = int(np.searchsorted(day_list, new_days[0]))
+        for name in ("_counts", "_revenue"):
+            old = getattr(self, name)
+            grown = np.zeros((len(day_list),) + old.shape[1:], dtype=old.dtype)
+            grown[old_rows] = old
+            setattr(self, name, grown)
+        for name in ("_cum_counts", "_cum_revenue"):
+            old = getattr(self, name)
+            grown = np.zeros((len(day_list) + 1,) + old.shape[1:], dtype=old.dtype)
+            grown[:first_new + 1] = old[:first_new + 1]
+            setattr(self, name, grown)
+        self._day_list = day_list
+
+    def _extend_thresholds(self, max_amount):
+        # Every existing deal is below the old last threshold, so the new buckets start out empty
+        thresholds = _thresholds_in_use(self.all_thresholds, max_amount)
+        extra = len(thresholds) - len(self.thresholds)
+        if extra <= 0:
+            return
+        for name in ("_counts", "_revenue", "_cum_counts", "_cum_revenue"):
+            old = getattr(self, name)
+            setattr(self, name, np.concatenate([old, np.zeros(old.shape[:2] + (extra,), dtype=old.dtype)], axis=2))
+        self.thresholds = np.asarray(thresholds, dtype=np.float64)
+
+    def _accumulate(self, low):
+        # Totals "at or above" each threshold, then running sums over rows
+        at_least_counts = self._counts[low:, :, ::-1].cumsum(axis=2)[:, :, ::-1]
+        at_least_revenue = self._revenue[low:, :, ::-1].cumsum(axis=2)[:, :, ::-1]
+        self._cum_counts[low + 1:] = self._cum_counts[low] + at_least_counts.cumsum(axis=0)
+        self._cum_revenue[low + 1:] = self._cum_revenue[low] + at_least_revenue.cumsum(axis=0)
+
+
+def _thresholds_in_use(thresholds, max_amount):
+    # Buckets above the largest deal would all be empty; keep one of them to answer those values
+    if max_amount is None:
+        return thresholds[:1]
+    above = sum(1 for threshold in thresholds if threshold <= max_amount)
+    return thresholds[:max(above + 1, 1)]
+
+
+class ExportRollups:
+    """Keeps a DailyRollups in step with one deal export as it's re-read.
+
+    Rows appended to the export are added to a copy of the current rollups,
+    so only the days they touch are recomputed and readers of the previous
+    rollups never see a half-applied update. Any other change (edited or
+    removed rows) rebuilds from scratch.
+    """
+
+    def __init__(self):
+        self.deal_set = None
+        self.rollups = None
+        self.appended_rows = 0
+        self.rebuilds = 0
+        self._lock = threading.Lock()
+
+    def update(self, deal_set):
+        with self._lock:
+            if deal_set is self.deal_set:
+                return self.rollups
+            rollups = None
+            previous = self.deal_set
+            if previous is not None and deal_set.starts_with(previous):
+                rollups = self.rollups.copy()
+                try:
+                    rollups.add_deals(deal_set.tail(len(previous)))
+                    self.appended_rows += len(deal_set) - len(previous)
+                except ValueError:
+                    rollups = None
+            if rollups is None:
+                rollups = DailyRollups.from_deal_set(deal_set)
+                self.rebuilds += 1
+            self.deal_set, self.rollups = deal_set, rollups
+            return rollups
@@ -0,0 +1,167 @@
+"""Per-stage latency and token histograms, exportable as Prometheus text or JSONL.
+
+Stages are timed with ``TELEMETRY.span("webhook_round_trip")`` (or the
+``timed`` decorator) anywhere in the process and aggregated into
+fixed-bucket histograms for export, plus a window of recent samples for
+exact p50/p95/p99 in the diagnostics panel.
+"""
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from functools import wraps
+
+# Seconds: from a memoized parse up to a slow n8n run
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+# Tokens per OpenAI call
+TOKEN_BUCKETS = (50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+RECENT_SAMPLES = 2048
+METRIC_PREFIX = "sales_report"
+
+
+def percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+class Histogram:
+    """Cumulative-bucket histogram plus the most recent samples for percentiles."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.recent = deque(maxlen=RECENT_SAMPLES)
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        self.recent.append(value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[i] += 1
+                break
+
+    def cumulative(self):
+        # Prometheus buckets count everything at or below each bound
+        total, counts = 0, []
+        for count in self.bucket_counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def summary(self):
+        recent = list(self.recent)
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "p50": percentile(recent, 0.50),
+            "p95": percentile(recent, 0.95),
+            "p99": percentile(recent, 0.99)
+        }
+
+
+class Telemetry:
+    """Process-wide registry of stage latency and OpenAI token histograms."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._tokens = {}
+        self.started_at = time.time()
+
+    @contextmanager
+    def span(self, stage):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def timed(self, stage):
+        def decorate(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(stage):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def observe(self, stage, seconds):
+        with self._lock:
+            histogram = self._stages.get(stage)
+            if histogram is None:
+                histogram = self._stages[stage] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+
+    def record_tokens(self, prompt_tokens, completion_tokens):
+        with self._lock:
+            for kind, tokens in (("prompt", prompt_tokens), ("completion", completion_tokens)):
+                if tokens is None:
+                    continue
+                histogram = self._tokens.get(kind)
+                if histogram is None:
+                    histogram = self._tokens[kind] = Histogram(TOKEN_BUCKETS)
+                histogram.observe(tokens)
+
+    def snapshot(self):
+        # {"stages": {stage: summary}, "tokens": {kind: summary}}
+        with self._lock:
+            return {
+                "stages": {stage: h.summary() for stage, h in sorted(self._stages.items())},
+                "tokens": {kind: h.summary() for kind, h in sorted(self._tokens.items())}
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._tokens.clear()
+            self.started_at = time.time()
+
+    def to_prometheus(self):
+        lines = []
+        with self._lock:
+            families = [
+                (f"{METRIC_PREFIX}_stage_seconds", "stage", "Latency of each report and chatbot stage.",
+                 self._stages),
+                (f"{METRIC_PREFIX}_openai_tokens", "kind", "Prompt and completion tokens per OpenAI call.",
+                 self._tokens)
+            ]
+            for name, label, help_text, histograms in families:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for value, h in sorted(histograms.items()):
+                    for bound, count in zip(h.buckets, h.cumulative()):
+                        lines.append(f'{name}_bucket{{{label}="{value}",le="{bound}"}} {count}')
+                    lines.append(f'{name}_bucket{{{label}="{value}",le="+Inf"}} {h.count}')
+                    lines.append(f'{name}_sum{{{label}="{value}"}} {h.sum:.6f}')
+                    lines.append(f'{name}_count{{{label}="{value}"}} {h.count}')
+        return "\n".join(lines) + "\n"
+
+    def to_jsonl(self):
+        # One line per histogram, with percentiles and non-cumulative bucket counts
+        exported_at = time.time()
+        records = []
+        with self._lock:
+            for metric, histograms in (("stage_seconds", self._stages), ("openai_tokens", self._tokens)):
+                for name, h in sorted(histograms.items()):
+                    records.append({
+                        "exported_at": exported_at,
+                        "since": self.started_at,
+                        "metric": metric,
+                        "name": name,
+                        **h.summary(),
+                        "buckets": {**dict(zip(map(str, h.buckets), h.bucket_counts)),
+                                    "+Inf": h.count - sum(h.bucket_counts)}
+                    })
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+
+TELEMETRY = Telemetry()
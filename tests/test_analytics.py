@@ -0,0 +1,71 @@
+import json
+
+import pytest
+
+from analytics import list_exports, read_deals, resolve_export
+
+
+def write_json(tmp_path, data):
+    path = tmp_path / "deals.json"
+    path.write_text(json.dumps(data), encoding="utf-8")
+    return path
+
+
+def test_airtable_export(tmp_path):
+    path = write_json(tmp_path, {"records": [
+        {"id": "rec1", "fields": {"Close Date": "2024-05-02", "Amount": 1000, "Status": "Won"}},
+        {"id": "rec2", "fields": {"Close Date": "2024-05-03", "Amount": 2500, "Status": "Lost"}}
+    ]})
+    frame = read_deals(path)
+    assert list(frame["Amount"]) == [1000, 2500]
+
+
+def test_plain_record_list(tmp_path):
+    path = write_json(tmp_path, [{"close_date": "2024-05-02", "amount": 1000, "status": "Won"}])
+    assert len(read_deals(path)) == 1
+
+
+@pytest.mark.parametrize("data", [
+    {"offset": "itr123", "data": [{"amount": 1}]},
+    [[1, 2]],
+    [1, 2, 3],
+    "deals",
+    {"records": {"rec1": {}}},
+    {"records": [{"fields": [1, 2]}]},
+])
+def test_unexpected_json_shapes_raise_value_error(tmp_path, data):
+    with pytest.raises(ValueError, match="records"):
+        read_deals(write_json(tmp_path, data))
+
+
+def export_dir(tmp_path):
+    exports = tmp_path / "exports"
+    exports.mkdir()
+    (exports / "deals.csv").write_text("close_date,amount,status\n2024-05-02,1000,Won\n", encoding="utf-8")
+    (exports / "notes.txt").write_text("not an export", encoding="utf-8")
+    (tmp_path / "secret.csv").write_text("close_date,amount,status\n", encoding="utf-8")
+    return exports
+
+
+def test_exports_are_listed_and_resolved_inside_the_directory(tmp_path):
+    exports = export_dir(tmp_path)
+    assert list_exports(str(exports)) == ["deals.csv"]
+    assert resolve_export("deals.csv", str(exports)) == str((exports / "deals.csv").resolve())
+
+
+@pytest.mark.parametrize("name", [
+    "../secret.csv",
+    "missing.csv",
+    "notes.txt",
+    "/etc/passwd",
+])
+def test_paths_outside_the_export_directory_are_refused(tmp_path, name):
+    exports = export_dir(tmp_path)
+    with pytest.raises(ValueError, match="No deal export named"):
+        resolve_export(name, str(exports))
+
+
+def test_local_exports_are_off_without_a_directory():
+    assert list_exports("") == []
+    with pytest.raises(ValueError, match="DEAL_EXPORT_DIR"):
+        resolve_export("deals.csv", "")
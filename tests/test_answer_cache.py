@@ -0,0 +1,66 @@
+import pytest
+
+from answer_cache import AnswerCache, question_scope
+
+REPORT = "report-hash"
+KEY = "sk-test-a"
+
+
+def cache_with(question, answer="cached answer"):
+    cache = AnswerCache()
+    cache.store(REPORT, KEY, question, answer)
+    return cache
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("What was our total revenue?", "what's the total revenue"),
+    ("How many deals did we close?", "How many deals were closed?"),
+    ("What are the key trends in this sales data?", "What are the key trends?"),
+])
+def test_rewordings_hit(stored, asked):
+    assert cache_with(stored).lookup(REPORT, KEY, asked) is not None
+
+
+@pytest.mark.parametrize("stored, asked", [
+    ("What was revenue compared to the previous month?", "What was revenue compared to the previous week?"),
+    ("What was revenue this quarter?", "What was revenue this year?"),
+    ("What was revenue last year?", "What was revenue?"),
+    ("How many deals did we win?", "How many deals did we lose?"),
+    ("How many deals are still open?", "How many deals did we close?"),
+    ("What is our revenue target?", "What is our revenue?"),
+    ("What was revenue on Monday?", "What was revenue on Friday?"),
+    ("How does revenue compare with last month?", "How does revenue compare with next month?"),
+])
+def test_lookalikes_with_different_scope_miss(stored, asked):
+    cache = cache_with(stored)
+    assert cache.lookup(REPORT, KEY, asked) is None
+    # ... in both directions
+    assert cache_with(asked).lookup(REPORT, KEY, stored) is None
+
+
+def test_scope_ignores_synonyms():
+    assert question_scope("revenue last month") == question_scope("revenue in the prior monthly period")
+    assert question_scope("What's our quota?") == question_scope("revenue goal")
+
+
+def test_same_scope_still_matches_after_other_scopes_are_cached():
+    cache = AnswerCache()
+    cache.store(REPORT, KEY, "What was revenue compared to the previous month?", "monthly answer")
+    cache.store(REPORT, KEY, "What was revenue compared to the previous week?", "weekly answer")
+    hit = cache.lookup(REPORT, KEY, "How did revenue compare to the previous week?")
+    assert hit is not None and hit.answer == "weekly answer"
+
+
+def test_answers_are_not_shared_across_api_keys():
+    cache = cache_with("What was our total revenue?")
+    assert cache.lookup(REPORT, "sk-someone-else", "What was our total revenue?") is None
+    assert cache.lookup(REPORT, "", "What was our total revenue?") is None
+    assert cache.lookup(REPORT, KEY, "What was our total revenue?") is not None
+
+
+def test_invalidate_drops_every_keys_answers():
+    cache = cache_with("What was our total revenue?")
+    cache.store(REPORT, "sk-test-b", "What was our total revenue?", "other answer")
+    cache.invalidate(REPORT)
+    assert cache.stats()["entries"] == 0
+    assert cache.stats()["reports"] == 0
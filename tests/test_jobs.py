@@ -0,0 +1,51 @@
+import threading
+import time
+
+from jobs import DONE, JobManager
+
+
+def wait_for(manager, job_id, timeout=5):
+    for _ in range(int(timeout / 0.01)):
+        job = manager.get(job_id)
+        if job.finished:
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_duplicate_submits_share_one_job():
+    manager = JobManager(max_workers=2)
+    release = threading.Event()
+    calls = []
+
+    def slow_report(name):
+        calls.append(name)
+        release.wait(5)
+        return name
+
+    ids = {manager.submit(slow_report, "last 7 days", key="last 7 days") for _ in range(4)}
+    # The duplicates didn't take the second worker, so another report runs right away
+    other = manager.submit(lambda: "custom", key="custom")
+    assert wait_for(manager, other).result == "custom"
+
+    release.set()
+    assert len(ids) == 1
+    job = wait_for(manager, ids.pop())
+    assert job.state == DONE and job.result == "last 7 days"
+    assert calls == ["last 7 days"]
+    assert manager.joined == 3
+
+
+def test_finished_jobs_take_no_more_joiners():
+    manager = JobManager(max_workers=1)
+    first = manager.submit(lambda: 1, key="report")
+    wait_for(manager, first)
+    second = manager.submit(lambda: 2, key="report")
+    assert second != first
+    assert wait_for(manager, second).result == 2
+    assert manager.joined == 0
+
+
+def test_jobs_without_a_key_never_merge():
+    manager = JobManager(max_workers=1)
+    assert manager.submit(lambda: 1) != manager.submit(lambda: 1)
@@ -0,0 +1,32 @@
+import prefetch
+from prefetch import AnswerPrefetcher
+
+REPORT = "✅ Won Deals: 4\n💰 Closed Revenue: $5,000"
+QUESTION = "What are the key trends in this sales data?"
+
+
+def test_answers_are_only_shared_with_the_same_api_key(monkeypatch):
+    calls = []
+
+    def fake_answer(self, client, report_text, question):
+        calls.append(client)
+        return f"answer via {client}", 0.1
+    monkeypatch.setattr(AnswerPrefetcher, "_answer", fake_answer)
+
+    prefetcher = AnswerPrefetcher()
+    prefetcher.prefetch(REPORT, "sk-alice", "alice-client", questions=[QUESTION])
+    assert prefetcher.get(REPORT, "sk-alice", QUESTION, timeout=5) == ("answer via alice-client", 0.1)
+
+    # Another key (valid or not) never sees Alice's answer
+    assert prefetcher.get(REPORT, "sk-mallory", QUESTION, timeout=5) is None
+    assert not prefetcher.ready(REPORT, "sk-mallory", QUESTION)
+
+    # ... and prefetching with it makes its own call with its own client
+    prefetcher.prefetch(REPORT, "sk-mallory", "mallory-client", questions=[QUESTION])
+    assert prefetcher.get(REPORT, "sk-mallory", QUESTION, timeout=5) == ("answer via mallory-client", 0.1)
+    assert calls == ["alice-client", "mallory-client"]
+
+
+def test_api_key_is_not_stored():
+    key = prefetch._entry_key(REPORT, "sk-secret")
+    assert "sk-secret" not in repr(key)
@@ -0,0 +1,71 @@
+import pytest
+
+from query_router import LOCAL, MODEL, QueryRouter, classify
+
+REPORT = """📊 *Weekly Sales Report* (2024-05-01 → 2024-05-07)
+✅ Won Deals: 42
+💰 Closed Revenue: $1,284,500
+📈 Latest: $1,284,500 | Prev: $1,102,300 | WoW: +16.5%"""
+
+
+@pytest.mark.parametrize("question, intent", [
+    ("What was revenue?", "revenue"),
+    ("What's our total revenue?", "revenue"),
+    ("How much revenue did we make this week?", "revenue"),
+    ("How many deals did we close?", "deals"),
+    ("How many deals?", "deals"),
+    ("What's the deal count?", "deals"),
+    ("Average deal size?", "avg_deal_size"),
+    ("What's our win rate?", "win_rate"),
+    ("What's the WoW change?", "wow_change"),
+    ("Week-over-week growth", "wow_change"),
+    ("Did revenue go up?", "wow_change"),
+    ("Is revenue up or down?", "wow_change"),
+    ("What was revenue in the previous period?", "prev_revenue"),
+])
+def test_plain_metric_lookups(question, intent):
+    assert classify(question) == intent
+
+
+@pytest.mark.parametrize("question", [
+    # Other deal statuses
+    "How many deals did we lose?",
+    "How many lost deals?",
+    "How many open deals?",
+    "Did the number of lost deals go up?",
+    # Segments
+    "How much revenue came from enterprise customers?",
+    "Revenue for enterprise?",
+    "Revenue per rep?",
+    "How many deals did Alice close?",
+    "Win rate by region",
+    # Other time ranges
+    "What was revenue last year?",
+    "What was revenue last month?",
+    "What was last week's revenue?",
+    "What was revenue on Monday?",
+    # Targets
+    "What is our revenue target?",
+    "What's the revenue forecast?",
+    # Direction questions about a metric the report has no trend for
+    "Did average deal size go down?",
+    "Is the win rate up?",
+    # Open-ended
+    "Why did revenue go up?",
+])
+def test_qualified_questions_go_to_the_model(question):
+    assert classify(question) is None
+
+
+def test_route_answers_locally_from_the_report():
+    decision = QueryRouter().route(REPORT, "How many deals did we close?")
+    assert decision.path == LOCAL
+    assert "42" in decision.answer
+
+
+def test_route_sends_unsupported_questions_to_the_model():
+    router = QueryRouter()
+    decision = router.route(REPORT, "How much revenue came from enterprise customers?")
+    assert decision.path == MODEL
+    assert decision.answer is None
+    assert router.model_answers == 1
@@ -0,0 +1,109 @@
+import pytest
+
+import report_parser
+from report_parser import ReportMetrics, parse_report, parse_report_uncached
+
+SAMPLE_REPORT = """📊 *Weekly Sales Report* (2024-05-01 → 2024-05-07)
+✅ Won Deals: 42
+💰 Closed Revenue: $1,284,500
+📈 Latest: $1,284,500 | Prev: $1,102,300 | WoW: +16.5%
+📝 Summary: Strong week driven by enterprise renewals.
+💡 Insight: Average deal size grew while deal count stayed flat.
+🎯 Recommendation: Focus outreach on mid-market accounts this week."""
+
+
+def test_sample_report():
+    metrics = parse_report_uncached(SAMPLE_REPORT)
+    assert metrics.deals == 42
+    assert metrics.revenue == 1_284_500
+    assert metrics.latest_revenue == 1_284_500
+    assert metrics.prev_revenue == 1_102_300
+    assert metrics.wow_change == "+16.5%"
+    assert metrics.has_trend
+    assert metrics.summary == "Strong week driven by enterprise renewals."
+    assert [kind for kind, _ in metrics.insight_lines] == ["latest", "summary", "insight", "recommendation"]
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("💰 Closed Revenue: $12,450", 12_450),
+    ("💰 Closed Revenue: $1,284,500", 1_284_500),
+    ("💰 Closed Revenue: $12,450.50", 12_450.5),
+    ("💰 Closed Revenue: $980", 980),
+])
+def test_thousands_separators_and_decimals(line, expected):
+    assert parse_report_uncached(line).revenue == expected
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("WoW: +16.5%", "+16.5%"),
+    ("WoW: -3.25%", "-3.25%"),
+    ("WoW: 12%", "12%"),
+])
+def test_decimal_wow(line, expected):
+    assert parse_report_uncached(line).wow_change == expected
+
+
+@pytest.mark.parametrize("report", [
+    "💰 Closed Revenue: $900\n📈 Latest: $1,000 | Prev: $800",
+    "📈 Latest: $1,000 | Prev: $800\n💰 Closed Revenue: $900",
+    "💰 Closed Revenue: $900 | Latest: $1,000 | Prev: $800",
+])
+def test_latest_takes_priority_over_closed_revenue(report):
+    metrics = parse_report_uncached(report)
+    assert metrics.revenue == 1_000
+    assert metrics.prev_revenue == 800
+
+
+def test_closed_revenue_without_latest():
+    metrics = parse_report_uncached("✅ Won Deals: 3\n💰 Closed Revenue: $4,500")
+    assert metrics.revenue == 4_500
+    assert metrics.latest_revenue is None
+    assert not metrics.has_trend
+
+
+@pytest.mark.parametrize("line", [
+    "Won Deals: n/a",
+    "Latest: | Prev: |",
+    "WoW: --%",
+    "Closed Revenue: $,,,",
+    "Insight:",
+    "\x00\x01 Latest:",
+    "||||",
+    "Recommendation: " + "x" * 500,
+    "",
+])
+def test_malformed_lines_fall_back_to_defaults(line):
+    metrics = parse_report_uncached(line)
+    assert metrics.deals == 0
+    assert metrics.revenue == 0
+    assert metrics.latest_revenue is None
+    assert metrics.prev_revenue is None
+    assert metrics.wow_change == "0%"
+
+
+def test_malformed_lines_keep_labels_but_not_values():
+    metrics = parse_report_uncached("Won Deals: n/a\nLatest: | Prev: |\nInsight:")
+    assert {"Won Deals:", "Latest:", "Prev:", "Insight:"} <= metrics.labels
+    assert metrics.deals == 0
+    assert metrics.insight is None
+
+
+def test_memoized_parse_is_reused(monkeypatch):
+    report = SAMPLE_REPORT + "\n(memo test)"
+    first = parse_report(report)
+
+    def fail(_):
+        raise AssertionError("parsed again")
+    monkeypatch.setattr(report_parser, "parse_report_uncached", fail)
+
+    assert parse_report(report) is first
+    # Equal text in a different string object hits the same entry
+    assert parse_report("".join(list(report))) is first
+
+
+def test_memo_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(report_parser, "PARSE_CACHE_SIZE", 3)
+    for i in range(10):
+        parse_report(f"✅ Won Deals: {i}")
+    assert len(report_parser._cache) <= 3
+    assert isinstance(parse_report("✅ Won Deals: 9"), ReportMetrics)
@@ -0,0 +1,95 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from analytics import DealSet, compute_metrics
+from rollups import DailyRollups, ExportRollups
+
+ROWS = [
+    ("2024-05-01", 1000, "Won"),
+    ("2024-05-02", 2500, "Closed"),
+    ("2024-05-03", 4000, "Lost"),
+    ("2024-05-08", 1500, "Won"),
+    ("2024-05-09", 12000, "Won"),
+]
+
+
+def deal_set(rows):
+    return DealSet.from_frame(pd.DataFrame(rows, columns=["close_date", "amount", "status"]))
+
+
+@pytest.mark.parametrize("min_deal_value", [0, 2000])
+def test_rollups_match_a_full_scan(min_deal_value):
+    deals = deal_set(ROWS)
+    rollups = DailyRollups.from_deal_set(deals)
+    start, end = date(2024, 5, 6), date(2024, 5, 12)
+    assert rollups.metrics(start, end, min_deal_value) == compute_metrics(deals, start, end, min_deal_value)
+
+
+def test_appended_rows_are_added_without_a_rebuild():
+    export = ExportRollups()
+    first = export.update(deal_set(ROWS[:3]))
+    grown = deal_set(ROWS + [("2024-05-10", 3000, "Lost")])
+    rollups = export.update(grown)
+
+    assert export.rebuilds == 1
+    assert export.appended_rows == 3
+    # Readers still holding the previous rollups see them unchanged
+    assert first.days == 3
+    start, end = date(2024, 5, 6), date(2024, 5, 12)
+    assert rollups.metrics(start, end) == DailyRollups.from_deal_set(grown).metrics(start, end)
+
+
+@pytest.mark.parametrize("extra", [
+    # Older than the first rollup day
+    [("2024-04-20", 500, "Won")],
+    # Larger than every threshold in use
+    [("2024-05-10", 300_000, "Won")],
+    # A new day between two existing ones, and an existing day
+    [("2024-05-05", 700, "Won"), ("2024-05-02", 300, "Closed")],
+])
+def test_appended_rows_on_any_day(extra):
+    export = ExportRollups()
+    export.update(deal_set(ROWS))
+    rollups = export.update(deal_set(ROWS + extra))
+    assert export.rebuilds == 1
+    for start, end in [(date(2024, 4, 1), date(2024, 5, 31)), (date(2024, 5, 2), date(2024, 5, 5))]:
+        for min_deal_value in (0, 2000, 250_000):
+            assert rollups.metrics(start, end, min_deal_value) == \
+                compute_metrics(deal_set(ROWS + extra), start, end, min_deal_value)
+
+
+@pytest.mark.parametrize("rows", [
+    # An edited row
+    [("2024-05-01", 9999, "Won")] + ROWS[1:],
+    # A removed row
+    ROWS[1:],
+])
+def test_other_changes_rebuild(rows):
+    export = ExportRollups()
+    export.update(deal_set(ROWS))
+    rollups = export.update(deal_set(rows))
+    assert export.rebuilds == 2
+    start, end = date(2024, 4, 1), date(2024, 5, 31)
+    assert rollups.metrics(start, end) == DailyRollups.from_deal_set(deal_set(rows)).metrics(start, end)
+
+
+def test_far_off_date_only_adds_one_day():
+    rows = [("1970-01-01", 500, "Won"), ("2024-05-08", 1500, "Closed"), ("2024-05-08", 900, "Lost")]
+    rollups = DailyRollups.from_deal_set(deal_set(rows))
+    assert rollups.days == 2
+    # Buckets stop just above the largest deal
+    assert list(rollups.thresholds) == [0, 1000, 2000]
+    assert rollups._cum_counts.nbytes < 1024
+    for start, end in [(date(1970, 1, 1), date(2024, 5, 31)), (date(2024, 5, 6), date(2024, 5, 12))]:
+        assert rollups.metrics(start, end) == compute_metrics(deal_set(rows), start, end)
+
+
+@pytest.mark.parametrize("min_deal_value", [2000, 50_000, 1_000_000])
+def test_thresholds_above_the_largest_deal(min_deal_value):
+    deals = deal_set(ROWS)
+    rollups = DailyRollups.from_deal_set(deals)
+    assert rollups.supports(min_deal_value)
+    start, end = date(2024, 5, 6), date(2024, 5, 12)
+    assert rollups.metrics(start, end, min_deal_value) == compute_metrics(deals, start, end, min_deal_value)
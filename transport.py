@@ -0,0 +1,82 @@
+"""Shared HTTP transport: pooled keep-alive session for n8n and reusable OpenAI clients."""
+import random
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+HTTP_POOL_CONNECTIONS = 4
+HTTP_POOL_MAXSIZE = 20
+HTTP_RETRIES = 3
+# One quick reconnect covers a stale keep-alive socket; more would only delay
+# reporting that n8n is down (the breaker and health probe handle outages)
+HTTP_CONNECT_RETRIES = 1
+HTTP_BACKOFF_FACTOR = 0.5
+HTTP_BACKOFF_JITTER = 0.5
+CONNECT_TIMEOUT = 5
+
+OPENAI_MAX_CONNECTIONS = 20
+OPENAI_MAX_KEEPALIVE = 10
+OPENAI_TIMEOUT = 60
+OPENAI_MAX_RETRIES = 2
+
+
+class JitteredRetry(Retry):
+    """Exponential backoff plus random jitter so retrying sessions don't move in lockstep."""
+
+    def __init__(self, *args, jitter=HTTP_BACKOFF_JITTER, **kwargs):
+        self.jitter = jitter
+        super().__init__(*args, **kwargs)
+
+    def new(self, **kwargs):
+        retry = super().new(**kwargs)
+        retry.jitter = self.jitter
+        return retry
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        if backoff <= 0:
+            return backoff
+        return backoff + random.uniform(0, self.jitter)
+
+
+def create_http_session(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE,
+                        retries=HTTP_RETRIES, connect_retries=HTTP_CONNECT_RETRIES,
+                        backoff_factor=HTTP_BACKOFF_FACTOR):
+    # Connection errors are retried for every method (nothing reached the server yet).
+    # Read errors and 502/503/504 are only retried for idempotent methods, so a
+    # report POST is never re-sent after n8n might already have posted to Slack.
+    retry = JitteredRetry(
+        total=retries,
+        connect=connect_retries,
+        read=retries,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=Retry.DEFAULT_ALLOWED_METHODS,
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def create_openai_client(api_key, max_connections=OPENAI_MAX_CONNECTIONS,
+                         max_keepalive=OPENAI_MAX_KEEPALIVE, timeout=OPENAI_TIMEOUT,
+                         max_retries=OPENAI_MAX_RETRIES):
+    # Imported lazily so the report side works without the chatbot dependencies
+    from openai import OpenAI
+    try:
+        import httpx
+    except ImportError:
+        # Newer openai releases are built on the httpx2 fork instead
+        import httpx2 as httpx
+
+    http_client = httpx.Client(
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_keepalive),
+        timeout=timeout
+    )
+    return OpenAI(api_key=api_key, http_client=http_client, max_retries=max_retries, timeout=timeout)
@@ -0,0 +1,192 @@
+"""Regenerates the preset reports on a schedule so they're cached before anyone asks.
+
+The schedule is a comma-separated list of daily times and intervals, e.g.
+``REPORT_WARM_SCHEDULE="00:00,hourly"`` or ``"06:30,15m"``. Each warm run
+covers every preset, one at a time with a pause in between, and waits for
+interactive report jobs to drain first so it never takes n8n capacity from a
+user who's waiting.
+"""
+import logging
+import os
+import threading
+import time
+from datetime import datetime, time as day_time, timedelta
+
+from n8n_client import build_payload
+
+# Preset label (as shown in the sidebar) -> days covered
+PRESETS = {"Last 7 Days": 7, "Last 30 Days": 30}
+DEFAULT_STATUSES = ["Won", "Closed"]
+DEFAULT_CHANNEL = "#sales-reports"
+DEFAULT_MIN_DEAL_VALUE = 0
+
+WARM_SCHEDULE = os.environ.get("REPORT_WARM_SCHEDULE", "")
+WARM_CHANNEL = os.environ.get("REPORT_WARM_CHANNEL", DEFAULT_CHANNEL)
+# Pause between presets within one run
+DEFAULT_STAGGER_SECONDS = 30
+# How long a run waits for interactive jobs to finish before going ahead anyway
+DEFAULT_MAX_DEFER_SECONDS = 15 * 60
+DEFAULT_BUSY_POLL_SECONDS = 5
+# Wait after start-up before the first run, so it doesn't race the first page loads
+DEFAULT_STARTUP_DELAY = 10
+
+logger = logging.getLogger(__name__)
+
+
+def parse_schedule(spec):
+    # "00:00,hourly,15m" -> [("daily", time(0, 0)), ("every", 60), ("every", 15)]
+    entries = []
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if not part:
+            continue
+        if part == "hourly":
+            entries.append(("every", 60))
+        elif part == "daily":
+            entries.append(("daily", day_time(0, 0)))
+        elif part.endswith("m") and part[:-1].isdigit() and int(part[:-1]) > 0:
+            entries.append(("every", int(part[:-1])))
+        else:
+            try:
+                entries.append(("daily", day_time.fromisoformat(part)))
+            except ValueError:
+                raise ValueError(f"Unrecognised warm schedule entry: {part!r}") from None
+    return entries
+
+
+def next_run(schedule, now):
+    # Earliest scheduled time strictly after now; intervals are aligned to midnight
+    midnight = datetime.combine(now.date(), day_time(0, 0))
+    candidates = []
+    for kind, value in schedule:
+        if kind == "daily":
+            at = datetime.combine(now.date(), value)
+            candidates.append(at if at > now else at + timedelta(days=1))
+        else:
+            elapsed = (now - midnight) // timedelta(minutes=value) + 1
+            candidates.append(min(midnight + elapsed * timedelta(minutes=value), midnight + timedelta(days=1)))
+    return min(candidates) if candidates else None
+
+
+def preset_payload(days, now=None, slack_channel=DEFAULT_CHANNEL):
+    # Exactly what the sidebar builds for a preset with the default filters
+    end_date = now or datetime.now()
+    return build_payload(end_date - timedelta(days=days), end_date, DEFAULT_MIN_DEAL_VALUE,
+                         list(DEFAULT_STATUSES), slack_channel)
+
+
+class PresetWarmer:
+    """Daemon thread that runs ``warm(payload, ttl_seconds)`` for each preset on the schedule.
+
+    ``busy()`` says whether interactive work is in flight; ``restore(payload, max_age)``
+    can seed the cache at start-up (e.g. from the report history) and returns when that
+    report was generated, or None.
+    """
+
+    def __init__(self, warm, schedule, presets=PRESETS, slack_channel=DEFAULT_CHANNEL, busy=None,
+                 restore=None, stagger_seconds=DEFAULT_STAGGER_SECONDS,
+                 max_defer_seconds=DEFAULT_MAX_DEFER_SECONDS, startup_delay=DEFAULT_STARTUP_DELAY):
+        self.warm = warm
+        self.schedule = parse_schedule(schedule) if isinstance(schedule, str) else list(schedule)
+        self.presets = dict(presets)
+        self.slack_channel = slack_channel
+        self.busy = busy or (lambda: False)
+        self.restore = restore
+        self.stagger_seconds = stagger_seconds
+        self.max_defer_seconds = max_defer_seconds
+        self.startup_delay = startup_delay
+        self.next_run_at = None
+        self.runs = 0
+        self._status = {name: {"warmed_at": None, "status": None, "error": None} for name in self.presets}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None and self.schedule:
+            self._thread = threading.Thread(target=self._loop, name="preset-warmer", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def run_now(self):
+        self._wake.set()
+
+    def status(self):
+        # {preset: {"warmed_at", "status", "error"}}
+        with self._lock:
+            return {name: dict(status) for name, status in self._status.items()}
+
+    def ttl_seconds(self, now=None):
+        # Keep a warmed report until the following run has had time to replace it
+        now = now or datetime.now()
+        upcoming = next_run(self.schedule, now) or now + timedelta(days=1)
+        slack = self.max_defer_seconds + self.stagger_seconds * len(self.presets) + 5 * 60
+        return (upcoming - now).total_seconds() + slack
+
+    def warm_all(self, names=None):
+        now = datetime.now()
+        ttl_seconds = self.ttl_seconds(now)
+        presets = [(name, days) for name, days in self.presets.items() if names is None or name in names]
+        for i, (name, days) in enumerate(presets):
+            if i and self._stop.wait(self.stagger_seconds):
+                return
+            self._wait_until_idle()
+            if self._stop.is_set():
+                return
+            payload = preset_payload(days, now, self.slack_channel)
+            try:
+                outcome = self.warm(payload, ttl_seconds)
+                status, error = outcome["status"], outcome.get("error")
+            except Exception as e:
+                status, error = "error", str(e)
+            if status != "success":
+                logger.warning("Warming %s failed: %s %s", name, status, error or "")
+            with self._lock:
+                entry = self._status[name]
+                entry["status"], entry["error"] = status, error
+                if status == "success":
+                    entry["warmed_at"] = time.time()
+        self.runs += 1
+
+    def _restore_all(self):
+        # Names of the presets seeded without calling the workflow
+        restored = set()
+        if self.restore is None:
+            return restored
+        now = datetime.now()
+        max_age = self.ttl_seconds(now)
+        for name, days in self.presets.items():
+            try:
+                warmed_at = self.restore(preset_payload(days, now, self.slack_channel), max_age)
+            except Exception:
+                logger.exception("Restoring %s from history failed", name)
+                warmed_at = None
+            if warmed_at:
+                with self._lock:
+                    self._status[name].update(warmed_at=warmed_at, status="success", error=None)
+                restored.add(name)
+        return restored
+
+    def _wait_until_idle(self):
+        deadline = time.monotonic() + self.max_defer_seconds
+        while self.busy() and time.monotonic() < deadline:
+            if self._stop.wait(DEFAULT_BUSY_POLL_SECONDS):
+                return
+
+    def _loop(self):
+        # After a restart, reports warmed before it are reused instead of re-run
+        cold = set(self.presets) - self._restore_all()
+        if cold and not self._stop.wait(self.startup_delay):
+            self.warm_all(cold)
+        while not self._stop.is_set():
+            self.next_run_at = next_run(self.schedule, datetime.now())
+            delay = max(0.0, (self.next_run_at - datetime.now()).total_seconds())
+            self._wake.wait(delay)
+            self._wake.clear()
+            if not self._stop.is_set():
+                self.warm_all()